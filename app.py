@@ -1,398 +1,65 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-import uvicorn
-import random
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import hmac
+import json
+import os
 import time
-from datetime import datetime, timedelta
+
+from quantdata import formats, ohlc, server
+from quantdata.content import PostLibrary
+from quantdata.feed import MAX_LIVE_BARS, BarFeed, bar_index, first_bar, parse_event_id, stream as live_stream
+from quantdata.indicators import decode_state, encode_state, indicator_window, parse_indicators
+from quantdata.batch import BatchRunner, parse_symbols
+from quantdata.cache import LIVE_TTL, ResponseCache, etag_matches
+from quantdata.pages import PageCache
+from quantdata.pagination import decode_cursor, encode_cursor
+from quantdata.ratelimit import RateLimiter, RateLimitMiddleware, parse_keys
+from quantdata.resample import check_work, rollups
+from quantdata.singleflight import SingleFlight
+from quantdata.store import BarStore
+from quantdata.metrics import Metrics, MetricsMiddleware
+from quantdata.orderbook import LEVELS as BOOK_LEVELS, BookHub, stream as book_stream
+from quantdata.profiler import MAX_SECONDS, Profiler, ProfilerMiddleware
+from quantdata.latency import DEFAULT_LATENCY, parse_latency, simulate_latency
+from quantdata.ticks import MAX_SYMBOLS, Subscriber, TickHub, parse_subscription
 
 app = FastAPI(title="QuantDataApi", docs_url=None, redoc_url=None)
 
+# Token buckets for /api/*: per configured API key (QDA_API_KEYS="key:tier,..."), otherwise per client address
+rate_limiter = RateLimiter(parse_keys(os.environ.get("QDA_API_KEYS")))
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# Sampling profiler, started on demand through /admin/profile
+profiler = Profiler()
+app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+# Per-route counts and latency histograms plus stage timers, served at /metrics
+metrics = Metrics(app.routes)
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # Setup Jinja2 templates
 templates = Jinja2Templates(directory="templates")
+metrics.instrument_templates(templates)
+# Pages whose context never changes are rendered once and served precompressed
+pages = PageCache(templates, "templates")
 
-# Sample Blog Data
-blog_posts = [
-    {
-        "id": 1,
-        "slug": "architecting-for-100us-latency",
-        "title": "Architecting for 100μs Latency: Our New WebSocket Core",
-        "date": "May 24, 2024",
-        "author_name": "Erik Lindgren",
-        "author_role": "Head of Infrastructure",
-        "read_time": "12 min read",
-        "category": "Engineering",
-        "featured": True,
-        "image": "https://images.unsplash.com/photo-1518770660439-4636190af475?q=80&w=2000&auto=format&fit=crop",
-        "summary": "How we rebuilt our market data distribution engine from the ground up using Rust and kernel-bypass networking to deliver institutional-grade performance to retail developers.",
-        "content_intro": "In the world of high-frequency trading and real-time market data, every microsecond counts. This post explores how we rebuilt our Market Data Core from the ground up using Rust and kernel-bypass networking to deliver sub-ms latency at massive scale.",
-        "content": """
-<h2>The Bottleneck: JSON Overhead</h2>
-<p>
-    When we first launched QuantDataApi, our feeds relied on standard JSON payloads. While human-readable and easy to debug, the serialization/deserialization cost became a significant bottleneck as we scaled to support more institutional clients.
-</p>
-<ul>
-    <li><strong>Payload Size:</strong> JSON's verbosity leads to larger packet sizes, increasing network congestion.</li>
-    <li><strong>CPU Cycles:</strong> Parsing large JSON objects 100,000 times per second puts unnecessary strain on client-side CPU.</li>
-    <li><strong>Garbage Collection:</strong> Frequent object creation in languages like Java or Node.js leads to unpredictable GC pauses.</li>
-</ul>
-<blockquote>
-    "Transitioning from JSON to a binary protocol reduced our total network egress by 64% and decreased client-side CPU usage by an average of 40%."
-</blockquote>
-<h2>Implementation: Switching to Protocol Buffers</h2>
-<p>
-    To address these issues, we implemented a custom binary protocol using Protocol Buffers (protobuf). This allows for strictly typed messages and minimal overhead. Here's how a typical tick update looks in our new implementation:
-</p>
-<div class="bg-surface rounded-xl overflow-hidden border border-border my-8 font-mono text-[13px]">
-    <div class="flex items-center justify-between px-5 py-3 bg-background/50 border-b border-border">
-        <span class="text-text-muted tracking-wider text-[11px] uppercase">market_feed.proto</span>
-        <span class="material-symbols-outlined text-[16px] text-text-muted cursor-pointer hover:text-primary">content_copy</span>
-    </div>
-    <div class="p-6 text-text-muted leading-relaxed">
-        <div><span class="text-secondary text-pink-400">syntax</span> = <span class="text-primary text-emerald-400">"proto3"</span>;</div>
-        <div class="mt-4"><span class="text-secondary text-pink-400">message</span> <span class="text-text-main text-slate-100">MarketTick</span> {</div>
-        <div class="pl-4"> <span class="text-secondary text-pink-400">string</span> symbol = <span class="text-primary text-emerald-400">1</span>;</div>
-        <div class="pl-4"> <span class="text-secondary text-pink-400">double</span> price = <span class="text-primary text-emerald-400">2</span>;</div>
-        <div class="pl-4"> <span class="text-secondary text-pink-400">uint64</span> timestamp = <span class="text-primary text-emerald-400">3</span>;</div>
-        <div class="pl-4"> <span class="text-secondary text-pink-400">int32</span> volume = <span class="text-primary text-emerald-400">4</span>;</div>
-        <div class="pl-4"> <span class="text-secondary text-pink-400">enum</span> Side { BUY = 0; SELL = 1; }</div>
-        <div class="pl-4">  Side side = <span class="text-primary text-emerald-400">5</span>;</div>
-        <div>}</div>
-    </div>
-</div>
-<h3>Zero-Copy Buffer Management</h3>
-<p>
-    On the backend, we utilized zero-copy techniques in our Go implementation. By reusing buffers and avoiding memory allocations in the hot path, we eliminated latency spikes during high volatility periods (like market opens).
-</p>
-<div class="bg-surface rounded-xl overflow-hidden border border-border my-8 font-mono text-[13px]">
-    <div class="flex items-center justify-between px-5 py-3 bg-background/50 border-b border-border">
-        <span class="text-text-muted tracking-wider text-[11px] uppercase">latency_metrics.js</span>
-        <span class="material-symbols-outlined text-[16px] text-text-muted cursor-pointer hover:text-primary">content_copy</span>
-    </div>
-    <div class="p-6 text-text-muted">
-        <div class="text-text-muted/50">// Client-side measurement of E2E latency</div>
-        <div class="text-secondary text-pink-400">const</div> <span class="text-text-main text-slate-100">socket</span> = <span class="text-secondary text-pink-400">new</span> <span class="text-primary text-emerald-400">QuantSocket</span>(API_KEY);<br/><br/>
-        <span class="text-text-main text-slate-100">socket</span>.<span class="text-primary text-emerald-400">on</span>(<span class="text-secondary text-pink-400">'tick'</span>, (<span class="text-text-main text-slate-100">data</span>) => {<br/>
-        &nbsp;&nbsp;<span class="text-secondary text-pink-400">const</span> <span class="text-text-main text-slate-100">latency</span> = <span class="text-text-main text-slate-100">Date</span>.<span class="text-primary text-emerald-400">now</span>() - <span class="text-text-main text-slate-100">data.serverTime</span>;<br/>
-        &nbsp;&nbsp;<span class="text-text-main text-slate-100">console</span>.<span class="text-primary text-emerald-400">log</span>(<span class="text-secondary text-pink-400">`E2E Latency: ${latency}ms`</span>);<br/>
-        });
-    </div>
-</div>
-<h2>Conclusion</h2>
-<p>
-    Moving to binary protocols and implementing aggressive buffer management has transformed QuantDataApi from a developer-friendly tool to a professional-grade trading infrastructure. Our customers can now build production-ready trading bots that compete at the highest levels.
-</p>
-"""
-    },
-    {
-        "id": 2,
-        "slug": "mastering-high-frequency-backtesting",
-        "title": "Mastering High-Frequency Backtesting with Parquet",
-        "date": "May 18, 2024",
-        "author_name": "Alex Miller",
-        "author_role": "Data Scientist",
-        "read_time": "8 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1518770660439-4636190af475?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Learn how to efficiently process terabytes of historical tick data using the Apache Parquet format and DuckDB for ultra-fast local backtesting."
-    },
-    {
-        "id": 3,
-        "slug": "handling-corporate-actions-adjusted-price-guide",
-        "title": "Handling Corporate Actions: The Adjusted Price Guide",
-        "date": "May 12, 2024",
-        "author_name": "Sarah Chen",
-        "author_role": "Product Manager",
-        "read_time": "5 min read",
-        "category": "Market Data",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1590283603385-17ffb3a7f29f?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Why adjusted prices matter and how our API handles stock splits, dividends, and spin-offs automatically to maintain your strategy's integrity."
-    },
-    {
-        "id": 4,
-        "slug": "extended-hours-options-chains",
-        "title": "New: Extended Hours Options Chains Now Available",
-        "date": "May 05, 2024",
-        "author_name": "Pat Knight",
-        "author_role": "Equity Analyst",
-        "read_time": "4 min read",
-        "category": "Product Updates",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1620641788421-7a1c342ea42e?q=80&w=1200&auto=format&fit=crop",
-        "summary": "We've expanded our options coverage to include pre-market and after-hours Greek calculations for the entire US equity universe."
-    },
-    {
-        "id": 5,
-        "slug": "real-time-risk-engine-go",
-        "title": "Building a Real-Time Risk Engine with Go",
-        "date": "Apr 28, 2024",
-        "author_name": "James Doe",
-        "author_role": "Backend Engineer",
-        "read_time": "15 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1551288049-bebda4e38f71?q=80&w=1200&auto=format&fit=crop",
-        "summary": "A deep dive into concurrency patterns for monitoring thousands of active streams while maintaining sub-millisecond safety checks."
-    },
-    {
-        "id": 6,
-        "slug": "zero-copy-serialization",
-        "title": "Zero-Copy Serialization in Financial APIs",
-        "date": "Apr 20, 2024",
-        "author_name": "Erik Lindgren",
-        "author_role": "Head of Infrastructure",
-        "read_time": "10 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1526628953301-3e589a6a8b74?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Explaining our transition from JSON to FlatBuffers for high-throughput market data distribution and why it matters for your app.",
-        "content_intro": "As data throughput requirements grow, traditional serialization formats like JSON can become a significant bottleneck. This article explores how we implemented zero-copy serialization using FlatBuffers to achieve massive performance gains.",
-        "content": """
-<h2>The Serialization Challenge</h2>
-<p>
-    In high-frequency trading systems, the time spent converting data into a transmittable format can often exceed the actual transmission time. Standard JSON serialization involves heavy string manipulation and memory allocation that can't keep up with our 10ms update cycles.
-</p>
-
-<h3>JSON vs. FlatBuffers</h3>
-<ul>
-    <li><strong>JSON:</strong> Requires parsing the entire string into an object model before use. High CPU and memory overhead.</li>
-    <li><strong>FlatBuffers:</strong> Allows accessing data without parsing or unpacking. You read values directly from the binary buffer.</li>
-</ul>
-
-<div class="bg-surface rounded-xl overflow-hidden border border-border my-8 font-mono text-[13px]">
-    <div class="flex items-center justify-between px-5 py-3 bg-background/50 border-b border-border">
-        <span class="text-text-muted tracking-wider text-[11px] uppercase">schema.fbs</span>
-        <span class="material-symbols-outlined text-[16px] text-text-muted cursor-pointer hover:text-primary">content_copy</span>
-    </div>
-    <div class="p-6 text-text-muted">
-        <span class="text-pink-400">table</span> <span class="text-slate-100">PriceUpdate</span> {<br/>
-        &nbsp;&nbsp;symbol: <span class="text-emerald-400">string</span>;<br/>
-        &nbsp;&nbsp;price: <span class="text-emerald-400">float64</span>;<br/>
-        &nbsp;&nbsp;volume: <span class="text-emerald-400">int64</span>;<br/>
-        }
-    </div>
-</div>
-
-<h2>Wait-Free Performance</h2>
-<p>
-    By utilizing zero-copy techniques, our Go and Rust SDKs can process incoming price updates without ever allocating new memory on the heap. This leads to extremely stable latency profiles even during periods of extreme market volatility.
-</p>
-
-<blockquote>
-    "Our zero-copy implementation reduced P99 latency by 85% during the high-volatility window of the market open."
-</blockquote>
-
-<h2>Conclusion</h2>
-<p>
-    Zero-copy serialization isn't just an optimization; it's a requirement for modern financial infrastructure. By adopting FlatBuffers, we ensure that QuantDataApi remains the fastest way for developers to receive market data.
-</p>
-"""
-    },
-    {
-        "id": 7,
-        "slug": "sip-vs-direct-feed-latency",
-        "title": "Understanding SIP vs Direct Feed Latency",
-        "date": "Apr 15, 2024",
-        "author_name": "Alex Miller",
-        "author_role": "Data Scientist",
-        "read_time": "6 min read",
-        "category": "Market Data",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1639762681485-074b7f938ba0?q=80&w=1200&auto=format&fit=crop",
-        "summary": "A technical comparison of the National Best Bid and Offer (NBBO) sources and how QuantDataApi aggregates them for consistency."
-    },
-    {
-        "id": 8,
-        "slug": "scaling-market-data-websockets",
-        "title": "Scaling Market Data WebSockets to 1M Connections",
-        "date": "Apr 05, 2024",
-        "author_name": "Erik Lindgren",
-        "author_role": "Head of Infrastructure",
-        "read_time": "20 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1451187580459-43490279c0fa?q=80&w=1200&auto=format&fit=crop",
-        "summary": "How we use edge computing and custom load balancing to handle massive scale for our WebSocket users."
-    },
-    {
-        "id": 9,
-        "slug": "python-sdk-v2-release",
-        "title": "Announcing Python SDK v2.0: Now with Async Support",
-        "date": "Mar 28, 2024",
-        "author_name": "Sarah Chen",
-        "author_role": "Product Manager",
-        "read_time": "4 min read",
-        "category": "Product Updates",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1526374965328-7f61d4dc18c5?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Our popular Python SDK just got a major upgrade with full async support and improved type hinting for a better developer experience."
-    },
-    {
-        "id": 10,
-        "slug": "optimizing-postgres-for-timeseries",
-        "title": "Optimizing PostgreSQL for Time-Series Market Data",
-        "date": "Mar 15, 2024",
-        "author_name": "Erik Lindgren",
-        "author_role": "Head of Infrastructure",
-        "read_time": "15 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1544383835-bda2bc66a55d?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Deep dive into indexing strategies and partitioning techniques to keep your market data queries lightning fast as your database grows."
-    },
-    {
-        "id": 11,
-        "slug": "understanding-market-microstructure",
-        "title": "A Beginner's Guide to Market Microstructure",
-        "date": "Mar 05, 2024",
-        "author_name": "Alex Miller",
-        "author_role": "Data Scientist",
-        "read_time": "10 min read",
-        "category": "Market Data",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1639762681485-074b7f938ba0?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Everything you need to know about order books, liquidity, and the role of market makers in modern electronic exchanges."
-    },
-    {
-        "id": 12,
-        "slug": "quantdata-api-status-page-v2",
-        "title": "Introducing Our New Real-Time Status Dashboard",
-        "date": "Feb 28, 2024",
-        "author_name": "Sarah Chen",
-        "author_role": "Product Manager",
-        "read_time": "3 min read",
-        "category": "Product Updates",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1551288049-bebda4e38f71?q=80&w=1200&auto=format&fit=crop",
-        "summary": "We've rebuilt our status page from scratch to provide sub-second latency updates on all our major API endpoints and WebSocket feeds."
-    },
-    {
-        "id": 13,
-        "slug": "low-latency-networking-101",
-        "title": "Low-Latency Networking 101 for Fintech Developers",
-        "date": "Feb 15, 2024",
-        "author_name": "Erik Lindgren",
-        "author_role": "Head of Infrastructure",
-        "read_time": "12 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1544197150-b99a580bb7a8?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Understanding the networking stack from the perspective of a high-frequency trader: from NIC interrupts to kernel bypass."
-    },
-    {
-        "id": 14,
-        "slug": "distributed-consensus-financial-systems",
-        "title": "Distributed Consensus in Financial Systems",
-        "date": "Feb 05, 2024",
-        "author_name": "James Doe",
-        "author_role": "Backend Engineer",
-        "read_time": "15 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1451187580459-43490279c0fa?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Comparing Paxos, Raft, and other consensus algorithms for maintaining high-availability order matching engines."
-    },
-    {
-        "id": 15,
-        "slug": "options-greeks-explained-developers",
-        "title": "Options Greeks Explained for API Developers",
-        "date": "Jan 28, 2024",
-        "author_name": "Alex Miller",
-        "author_role": "Data Scientist",
-        "read_time": "8 min read",
-        "category": "Market Data",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1551288049-bebda4e38f71?q=80&w=1200&auto=format&fit=crop",
-        "summary": "A developer-first guide to Rho, Vega, Theta, Gamma, and Delta calculations in our real-time options feeds."
-    },
-    {
-        "id": 16,
-        "slug": "quantdata-api-mobile-app-preview",
-        "title": "First Look: The QuantDataApi Mobile Monitoring App",
-        "date": "Jan 15, 2024",
-        "author_name": "Sarah Chen",
-        "author_role": "Product Manager",
-        "read_time": "5 min read",
-        "category": "Product Updates",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1512941937669-90a1b58e7e9c?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Monitor your WebSocket health and market data streams on the go with our upcoming iOS and Android companion apps."
-    },
-    {
-        "id": 17,
-        "slug": "modernizing-legacy-financial-data",
-        "title": "Modernizing Legacy Financial Data Pipelines",
-        "date": "Jan 05, 2014",
-        "author_name": "Erik Lindgren",
-        "author_role": "Head of Infrastructure",
-        "read_time": "11 min read",
-        "category": "Engineering",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1460925895917-afdab827c52f?q=80&w=1200&auto=format&fit=crop",
-        "summary": "How we migrated from monolithic overnight batch jobs to a cloud-native real-time event-driven architecture."
-    },
-    {
-        "id": 18,
-        "slug": "understanding-market-impact-large-orders",
-        "title": "Understanding Market Impact and Slippage",
-        "date": "Dec 20, 2023",
-        "author_name": "Alex Miller",
-        "author_role": "Data Scientist",
-        "read_time": "9 min read",
-        "category": "Market Data",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1543286386-713bdd548da4?q=80&w=1200&auto=format&fit=crop",
-        "summary": "Measuring and modeling how large order execution affects market liquidity and price movement."
-    },
-    {
-        "id": 19,
-        "slug": "quantdata-api-v3-roadmap",
-        "title": "QuantDataApi v3.0: The Future Roadmap",
-        "date": "Dec 10, 2023",
-        "author_name": "Sarah Chen",
-        "author_role": "Product Manager",
-        "read_time": "6 min read",
-        "category": "Product Updates",
-        "featured": False,
-        "image": "https://images.unsplash.com/photo-1506784983877-45594efa4cbe?q=80&w=1200&auto=format&fit=crop",
-        "summary": "A glimpse into 2024: Cross-asset correlation APIs, machine learning signals, and global equity expansion."
-    }
-]
+# Blog posts live in content/blog; the store is rebuilt when those files change
+blog_library = PostLibrary("content/blog")
 
 @app.get("/blog")
 async def blog_index(request: Request, page: int = 1, category: str = "All", q: str = ""):
-    filtered_posts = blog_posts
-    
-    # 1. Search filter
-    if q:
-        q_lower = q.lower()
-        filtered_posts = [p for p in filtered_posts if q_lower in p["title"].lower() or q_lower in p["summary"].lower()]
-    
-    # 2. Category filter
-    if category != "All":
-        filtered_posts = [p for p in filtered_posts if p["category"] == category]
-    
-    # 3. Featured post (always from full list for the section, or could be filtered)
-    featured_post = next((p for p in blog_posts if p.get("featured")), None)
-    
-    # Remove featured from the grid if it's there
-    posts_for_grid = [p for p in filtered_posts if not p.get("featured")]
-    
-    # 4. Pagination
-    per_page = 6
-    total_posts = len(posts_for_grid)
-    total_pages = (total_posts + per_page - 1) // per_page
-    
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    paginated_posts = posts_for_grid[start_idx:end_idx]
+    # Precomputed grid page, or ranked prefix search when q is set
+    blog_store = blog_library.current()
+    paginated_posts, total_pages = blog_store.query(category, page, q)
     
     return templates.TemplateResponse("blog/index.html", {
         "request": request,
         "page_name": "blog",
-        "featured_post": featured_post,
+        "featured_post": blog_store.featured,
         "posts": paginated_posts,
         "current_page": page,
         "total_pages": total_pages,
@@ -402,12 +69,13 @@ async def blog_index(request: Request, page: int = 1, category: str = "All", q:
 
 @app.get("/blog/{slug}")
 async def blog_post(request: Request, slug: str):
-    post = next((p for p in blog_posts if p["slug"] == slug), None)
+    blog_store = blog_library.current()
+    post = blog_store.get(slug)
     if not post:
         return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
     
     # Simple related posts logic: other posts
-    related_posts = [p for p in blog_posts if p["slug"] != slug][:6]
+    related_posts = blog_store.related(slug)
     
     return templates.TemplateResponse("blog/post.html", {
         "request": request,
@@ -419,83 +87,83 @@ async def blog_post(request: Request, slug: str):
 @app.get("/")
 async def index(request: Request):
     # Pass first 3 non-featured posts for the homepage section
-    recent_posts = [p for p in blog_posts if not p.get("featured")][:3]
-    return templates.TemplateResponse("index.html", {
-        "request": request,
+    recent_posts = blog_library.current().recent(3)
+    # The page only changes when the blog content does
+    return pages.response(request, "index.html", {
         "recent_posts": recent_posts
-    })
+    }, key=f"index:{blog_library.version}")
 
 @app.get("/docs")
 async def docs_overview(request: Request):
-    return templates.TemplateResponse("docs/overview.html", {"request": request, "page": "overview", "title": "Overview"})
+    return pages.response(request, "docs/overview.html", {"page": "overview", "title": "Overview"})
 
 @app.get("/pricing")
 async def pricing(request: Request):
-    return templates.TemplateResponse("pricing.html", {"request": request, "page": "pricing"})
+    return pages.response(request, "pricing.html", {"page": "pricing"})
 
 @app.get("/playground")
 async def playground(request: Request):
-    return templates.TemplateResponse("playground.html", {"request": request, "page": "playground"})
+    return pages.response(request, "playground.html", {"page": "playground"})
 
 @app.get("/contact")
 async def contact_page(request: Request):
-    return templates.TemplateResponse("contact.html", {"request": request, "page": "contact"})
+    return pages.response(request, "contact.html", {"page": "contact"})
 
 @app.get("/terms")
 async def terms_of_service(request: Request):
-    return templates.TemplateResponse("terms.html", {"request": request, "page": "terms"})
+    return pages.response(request, "terms.html", {"page": "terms"})
 
 @app.get("/privacy")
 async def privacy_policy(request: Request):
-    return templates.TemplateResponse("privacy.html", {"request": request, "page": "privacy"})
+    return pages.response(request, "privacy.html", {"page": "privacy"})
 
 @app.get("/docs/auth")
 async def docs_auth(request: Request):
-    return templates.TemplateResponse("docs/auth.html", {"request": request, "page": "auth", "title": "Authentication"})
+    return pages.response(request, "docs/auth.html", {"page": "auth", "title": "Authentication"})
 
 @app.get("/docs/concepts")
 async def docs_concepts(request: Request):
-    return templates.TemplateResponse("docs/concepts.html", {"request": request, "page": "concepts", "title": "Core Concepts"})
+    return pages.response(request, "docs/concepts.html", {"page": "concepts", "title": "Core Concepts"})
 
 @app.get("/docs/architecture")
 async def docs_architecture(request: Request):
-    return templates.TemplateResponse("docs/architecture.html", {"request": request, "page": "architecture", "title": "Architecture"})
+    return pages.response(request, "docs/architecture.html", {"page": "architecture", "title": "Architecture"})
 
 @app.get("/docs/api-reference")
 async def docs_api_reference(request: Request):
-    return templates.TemplateResponse("docs/api_reference.html", {"request": request, "page": "api-reference", "title": "Daily Time Series"})
+    return pages.response(request, "docs/api_reference.html", {"page": "api-reference", "title": "Daily Time Series"})
 
 @app.get("/docs/quickstart")
 async def docs_quickstart(request: Request):
-    return templates.TemplateResponse("docs/quickstart.html", {"request": request, "page": "quickstart", "title": "Quickstart Guide"})
+    return pages.response(request, "docs/quickstart.html", {"page": "quickstart", "title": "Quickstart Guide"})
 
 @app.get("/docs/sdks")
 async def docs_sdks(request: Request):
-    return templates.TemplateResponse("docs/sdks.html", {"request": request, "page": "sdks", "title": "SDKs & Libraries"})
+    return pages.response(request, "docs/sdks.html", {"page": "sdks", "title": "SDKs & Libraries"})
 
 @app.get("/docs/intraday")
 async def docs_intraday(request: Request):
-    return templates.TemplateResponse("docs/intraday.html", {"request": request, "page": "intraday", "title": "Intraday APIs"})
+    return pages.response(request, "docs/intraday.html", {"page": "intraday", "title": "Intraday APIs"})
 
 @app.get("/docs/monthly")
 async def docs_monthly(request: Request):
-    return templates.TemplateResponse("docs/monthly.html", {"request": request, "page": "monthly", "title": "Monthly APIs"})
+    return pages.response(request, "docs/monthly.html", {"page": "monthly", "title": "Monthly APIs"})
 
 @app.get("/docs/limits")
 async def docs_limits(request: Request):
-    return templates.TemplateResponse("docs/limits.html", {"request": request, "page": "limits", "title": "Rate Limits"})
+    return pages.response(request, "docs/limits.html", {"page": "limits", "title": "Rate Limits"})
 
 @app.get("/docs/errors")
 async def docs_errors(request: Request):
-    return templates.TemplateResponse("docs/errors.html", {"request": request, "page": "errors", "title": "Errors & Responses"})
+    return pages.response(request, "docs/errors.html", {"page": "errors", "title": "Errors & Responses"})
 
 @app.get("/docs/versioning")
 async def docs_versioning(request: Request):
-    return templates.TemplateResponse("docs/versioning.html", {"request": request, "page": "versioning", "title": "Versioning"})
+    return pages.response(request, "docs/versioning.html", {"page": "versioning", "title": "Versioning"})
 
 @app.get("/docs-v2")
 async def docs_v2(request: Request):
-    return templates.TemplateResponse("docs/v2.html", {"request": request, "page": "docs-v2", "title": "Documentation V2"})
+    return pages.response(request, "docs/v2.html", {"page": "docs-v2", "title": "Documentation V2"})
 
 @app.get("/docs/{slug}")
 async def docs_placeholder(request: Request, slug: str):
@@ -513,82 +181,395 @@ async def docs_placeholder(request: Request, slug: str):
         "versioning": "Versioning"
     }
     title = titles.get(slug, slug.replace("-", " ").title())
-    return templates.TemplateResponse("docs/under_development.html", {
-        "request": request, 
+    return pages.response(request, "docs/under_development.html", {
         "page": slug,
         "title": title
     })
 
-def generate_mock_ohlc(symbol, timeframe, start_date, end_date):
-    """Generates mock OHLC data for the playground."""
-    data = []
-    try:
-        start_ts = datetime.strptime(start_date, "%Y-%m-%d") if start_date else datetime.now() - timedelta(days=5)
-        end_ts = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
-    except ValueError:
-        start_ts = datetime.now() - timedelta(days=5)
-        end_ts = datetime.now()
-
-    # Determine step based on timeframe
-    if timeframe == 'daily':
-        delta = timedelta(days=1)
-        steps = (end_ts - start_ts).days + 1
+# Series built into QDA_STORE_DIR are served from memory-mapped files
+bar_store = BarStore()
+
+def mock_page(asset, symbol, timeframe, start_date, end_date, limit=None, cursor=None):
+    """Resolves a request to its series and one page of it.
+
+    Returns (series, first index, bar count, next cursor or None).
+    """
+    series = bar_store.series(asset, symbol, timeframe)
+    if cursor:
+        first, last = decode_cursor(cursor, series)
+    else:
+        start_ts, end_ts = ohlc.parse_range(start_date, end_date)
+        first, count = series.index_range(start_ts, end_ts)
+        last = first + count - 1
+
+    remaining = max(0, last - first + 1)
+    count = min(remaining, ohlc.MAX_BARS, limit or ohlc.MAX_BARS)
+    check_work(series, first, count)
+    next_cursor = encode_cursor(series, first + count, last) if count < remaining else None
+    return series, first, count, next_cursor
+
+def generate_mock_ohlc(symbol, timeframe, start_date, end_date, layout="rows", asset="equities", limit=None, cursor=None):
+    """Generates one page of mock OHLC data for the playground; returns (data, next cursor)."""
+    series, first, count, next_cursor = mock_page(asset, symbol, timeframe, start_date, end_date, limit, cursor)
+    bars = series.window(first, count)
+
+    if layout == "columns":
+        return ohlc.to_columns(bars), next_cursor
+    return ohlc.to_records(bars), next_cursor
+
+def stream_mock_ohlc(symbol, timeframe, start_date, end_date, asset="equities", limit=None, cursor=None):
+    """Chunked variant of generate_mock_ohlc; returns (bar count, chunk iterator, next cursor)."""
+    series, first, count, next_cursor = mock_page(asset, symbol, timeframe, start_date, end_date, limit, cursor)
+    return count, series.iter_window(first, count), next_cursor
+
+def render_mock_body(fmt, layout, series, first, count, metadata, indicators=(), states=None):
+    """Generates and serializes one page for the non-streaming formats."""
+    t0 = time.perf_counter_ns()
+    if indicators:
+        bars, extra, states = indicator_window(series, first, count, indicators, states)
+        metadata["indicator_state"] = encode_state(series, first + count, states)
     else:
-        # Default to 5min for mock if not daily
-        delta = timedelta(minutes=5)
-        steps = min(300, int((end_ts - start_ts).total_seconds() / 300) + 1)
+        bars, extra = series.window(first, count), None
+    t1 = time.perf_counter_ns()
+    metrics.stage("generate").record(t1 - t0)
+    if fmt in formats.BINARY_FORMATS:
+        body = formats.BINARY_ENCODERS[fmt](bars, metadata, extra)
+    else:
+        data = ohlc.to_columns(bars, extra) if layout == "columns" else ohlc.to_records(bars, extra)
+        body = formats.encode_json({"status": "success", "metadata": metadata, "data": data})
+    metrics.stage("serialize").record(time.perf_counter_ns() - t1)
+    return body
 
-    current_time = start_ts
-    last_price = 150.0 + random.random() * 100.0
-    
-    for _ in range(steps):
-        open_p = last_price
-        close_p = open_p + (random.random() - 0.5) * 4.0
-        high_p = max(open_p, close_p) + random.random() * 2.0
-        low_p = min(open_p, close_p) - random.random() * 2.0
-        volume = random.randint(100000, 1000000)
-
-        data.append({
-            "time": int(current_time.timestamp()),
-            "open": round(open_p, 2),
-            "high": round(high_p, 2),
-            "low": round(low_p, 2),
-            "close": round(close_p, 2),
-            "volume": volume
-        })
-        
-        last_price = close_p
-        current_time += delta
-        if len(data) >= 500: # Safety cap
-            break
-            
-    return data
+async def delay(profile):
+    """Simulated network latency, timed as its own stage."""
+    t0 = time.perf_counter_ns()
+    await simulate_latency(profile)
+    metrics.stage("simulated_latency").record(time.perf_counter_ns() - t0)
+
+result_cache = ResponseCache()
+mock_flights = SingleFlight()
 
 @app.get("/api/mock/data")
-async def get_mock_data(asset: str = "equities", symbol: str = "AAPL", tf: str = "5min", start: str = None, end: str = None):
-    # Simulate slight network delay
-    time.sleep(0.3)
-    
+async def get_mock_data(request: Request, asset: str = "equities", symbol: str = "AAPL", tf: str = "5min", start: str = None, end: str = None, layout: str = "rows", latency: str = None, format: str = None, limit: int = None, cursor: str = None, indicators: str = None, indicator_state: str = None):
     # Simple validation
     if not symbol:
         return {"status": "error", "message": "Symbol is required"}
-    
-    data = generate_mock_ohlc(symbol, tf, start, end)
-    
+
+    if limit is not None and limit < 1:
+        return {"status": "error", "message": "limit must be a positive integer"}
+
+    fmt = formats.negotiate(format, request.headers.get("accept"))
+    if fmt is None:
+        return {"status": "error", "message": f"Unsupported format: {format}"}
+
+    try:
+        profile = parse_latency(latency) if latency else DEFAULT_LATENCY
+        indicator_list = parse_indicators(indicators)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    if indicator_list and fmt in formats.STREAMING_FORMATS:
+        return {"status": "error", "message": f"Indicators are not available with format={fmt}"}
+    if indicator_state and not indicator_list:
+        return {"status": "error", "message": "indicator_state requires indicators"}
+
+    # Simulate slight network delay without stalling other requests
+    await delay(profile)
+
+    metadata = {
+        "symbol": symbol,
+        "timeframe": tf,
+        "asset": asset,
+        "start": start,
+        "end": end,
+    }
+
+    try:
+        # Streaming formats: bars go out chunk by chunk as they are generated
+        if fmt in formats.STREAMING_FORMATS:
+            count, chunks, next_cursor = stream_mock_ohlc(symbol, tf, start, end, asset, limit, cursor)
+            metadata["count"] = count
+            metadata["next_cursor"] = next_cursor
+            chunks = metrics.time_iter(chunks, "generate")
+            return StreamingResponse(formats.STREAM_ENCODERS[fmt](chunks, metadata), media_type=formats.MEDIA_TYPES[fmt])
+
+        series, first, count, next_cursor = mock_page(asset, symbol, tf, start, end, limit, cursor)
+        # Incremental mode: continue the indicators from the previous window's state
+        states = decode_state(indicator_state, series, first, indicator_list) if indicator_state else None
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    if fmt == "json":
+        metadata["layout"] = layout
+    metadata["count"] = count
+    metadata["next_cursor"] = next_cursor
+    if indicator_list:
+        metadata["indicators"] = tuple(name for ind in indicator_list for name in ind.columns)
+
+    # Serialized bodies are cached per resolved page; windows reaching the present expire quickly
+    key = (fmt, series.seed, first, tuple(metadata.values()), indicator_state)
+    entry = result_cache.get(key)
+    if entry is None:
+        # Identical concurrent misses share one render, off the event loop
+        async def render():
+            body = await run_in_threadpool(render_mock_body, fmt, layout, series, first, count, metadata, indicator_list, states)
+            live = series.time_of(first + count) > time.time()
+            return result_cache.put(key, body, formats.MEDIA_TYPES[fmt], ttl=LIVE_TTL if live else None)
+        entry = await mock_flights.do(key, render)
+
+    max_age = int(entry.expires - result_cache.clock()) if entry.expires is not None else 86400
+    headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={max(0, max_age)}"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type=entry.media_type, headers=headers)
+
+# Batch generation runs in worker processes, never on the event loop
+batch_runner = BatchRunner()
+
+@app.get("/api/mock/batch")
+async def get_mock_batch(asset: str = "equities", symbols: str = None, tf: str = "5min", start: str = None, end: str = None, layout: str = "rows", latency: str = None):
+    try:
+        symbol_list = parse_symbols(symbols)
+        profile = parse_latency(latency) if latency else DEFAULT_LATENCY
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    # One range for every symbol; the bar budget covers the whole batch
+    start_ts, end_ts = ohlc.parse_range(start, end)
+    series = bar_store.series(asset, symbol_list[0], tf)
+    first, count = series.index_range(start_ts, end_ts)
+    if count * len(symbol_list) > ohlc.MAX_BARS:
+        return {"status": "error", "message": f"Batch would return {count * len(symbol_list):,} bars; the limit is {ohlc.MAX_BARS:,}"}
+    try:
+        # Workers have their own rollup caches, so every symbol counts as uncached
+        check_work(series, first, count, copies=len(symbol_list), cached=False)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    await delay(profile)
+
+    metadata = {
+        "symbols": symbol_list,
+        "timeframe": tf,
+        "asset": asset,
+        "start": start,
+        "end": end,
+        "layout": layout,
+        "count": count,
+    }
+    lines = batch_runner.stream(asset, symbol_list, tf, first, count, layout, metadata)
+    return StreamingResponse(lines, media_type=formats.MEDIA_TYPES["ndjson"])
+
+@app.on_event("shutdown")
+def stop_batch_workers():
+    batch_runner.shutdown()
+
+# Filled in by warm_up(); served under "server" in /api/mock/stats
+startup = {"mode": server.MODE, "pid": os.getpid()}
+
+@app.on_event("startup")
+async def warm_up():
+    """Compiles templates, renders the cacheable pages, builds the blog index and fills the mock caches before serving."""
+    t0 = time.perf_counter()
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+    blog_library.current().query("All", 1, "warm")
+    paths = [
+        route.path for route in app.routes
+        if "GET" in getattr(route, "methods", ()) and "{" not in route.path
+        and not route.path.startswith(("/api/", "/admin/", "/metrics"))
+    ]
+    # app.router skips the middleware, so warm-up requests are not rate limited or counted in /metrics
+    timings = await server.warm_up(app.router, paths + ["/api/mock/data?latency=none"])
+    startup["warm_up_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    startup["warmed"] = len(timings)
+    startup["ready_s"] = round(server.process_age(), 3)
+    server.logger.info("Worker %d warmed %d routes in %.0f ms; ready %.2f s after process start",
+                       startup["pid"], startup["warmed"], startup["warm_up_ms"], startup["ready_s"])
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Admin endpoints exist only when QDA_ADMIN_TOKEN is set
+ADMIN_TOKEN = os.environ.get("QDA_ADMIN_TOKEN")
+
+def is_admin(request: Request):
+    """True if the request carries the admin token (X-Admin-Token or Authorization: Bearer)."""
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get("x-admin-token")
+    if token is None:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer":
+            return False
+    return hmac.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode())
+
+@app.get("/admin/profile")
+async def admin_profile(request: Request, seconds: float = None, route: str = None, requests: int = None, timeout: float = 60.0, interval: float = None, format: str = "json", top: int = 25):
+    """Samples stacks for `seconds`, or until `requests` requests under `route` complete."""
+    if not is_admin(request):
+        return Response(status_code=404)
+    if seconds is None and not (route and requests):
+        return {"status": "error", "message": "Pass seconds, or route and requests"}
+    if not 0 < (seconds or timeout) <= MAX_SECONDS or (requests is not None and requests < 1):
+        return {"status": "error", "message": f"Sessions are limited to {MAX_SECONDS} seconds"}
+
+    options = {"seconds": seconds} if seconds is not None else {"route": route, "requests": requests}
+    if interval is not None:
+        options["interval"] = min(1.0, max(0.001, interval))
+    try:
+        session = profiler.start(**options)
+    except RuntimeError as e:
+        return {"status": "error", "message": str(e)}
+    try:
+        deadline = time.monotonic() + (seconds or timeout)
+        while not session.done.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+    finally:
+        profiler.finish()
+
+    if format == "collapsed":
+        return Response(session.collapsed(), media_type="text/plain")
+    return {"status": "success", "profile": session.summary(), "top": session.top(top), "collapsed": session.collapsed()}
+
+@app.get("/api/mock/stats")
+async def mock_stats():
     return {
-        "status": "success",
-        "metadata": {
-            "symbol": symbol,
-            "timeframe": tf,
-            "asset": asset,
-            "start": start,
-            "end": end,
-            "count": len(data)
-        },
-        "data": data
+        "cache": result_cache.snapshot(),
+        "singleflight": mock_flights.snapshot(),
+        "rollups": rollups.snapshot(),
+        "store": bar_store.snapshot(),
+        "batch": batch_runner.snapshot(),
+        "ratelimit": rate_limiter.snapshot(),
+        "server": startup,
+        "live": bar_feed.snapshot(),
+        "books": book_hub.snapshot(),
     }
 
+tick_hub = TickHub()
+
+@app.on_event("shutdown")
+def stop_tick_producers():
+    tick_hub.close()
+
+async def pump_ticks(websocket: WebSocket, subscriber: Subscriber):
+    """Writes queued messages to the socket until the subscriber is evicted."""
+    while True:
+        message = await subscriber.queue.get()
+        if message is None:
+            await websocket.close(code=1013, reason="Slow consumer")
+            return
+        await websocket.send_text(message)
+
+async def read_commands(websocket: WebSocket, subscriber: Subscriber):
+    """Applies subscribe/unsubscribe commands sent by the client."""
+    while True:
+        try:
+            command = json.loads(await websocket.receive_text())
+            action = command.get("action")
+        except (ValueError, AttributeError):
+            subscriber.offer(json.dumps({"type": "error", "message": "Expected {\"action\": ..., \"symbols\": [...]}"}))
+            continue
+        try:
+            symbols = parse_subscription(command.get("symbols", []))
+        except ValueError as e:
+            subscriber.offer(json.dumps({"type": "error", "message": str(e)}))
+            continue
+
+        if action == "subscribe":
+            if len(subscriber.symbols | set(symbols)) > MAX_SYMBOLS:
+                subscriber.offer(json.dumps({"type": "error", "message": f"At most {MAX_SYMBOLS} symbols per connection"}))
+                continue
+            for symbol in symbols:
+                tick_hub.subscribe(subscriber, symbol)
+        elif action == "unsubscribe":
+            for symbol in symbols:
+                tick_hub.unsubscribe(subscriber, symbol)
+        else:
+            subscriber.offer(json.dumps({"type": "error", "message": f"Unknown action: {action}"}))
+            continue
+        subscriber.offer(json.dumps({"type": action + "d", "symbols": sorted(subscriber.symbols)}))
+
+@app.websocket("/ws/ticks")
+async def ws_ticks(websocket: WebSocket):
+    await websocket.accept()
+    subscriber = Subscriber()
+    tasks = [asyncio.create_task(pump_ticks(websocket, subscriber)), asyncio.create_task(read_commands(websocket, subscriber))]
+    try:
+        # Either side finishing (client gone, or evicted) ends the session
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        tick_hub.unsubscribe_all(subscriber)
+        for task in tasks:
+            task.cancel()
+
+# Live chart feed: one producer per watched series, shared by every viewer
+bar_feed = BarFeed()
+
+@app.on_event("shutdown")
+def stop_bar_feed():
+    bar_feed.close()
+
+@app.get("/api/mock/live")
+async def live_bars(request: Request, asset: str = "equities", symbol: str = "AAPL", tf: str = "5min", bars: int = 300, last_event_id: str = None):
+    """SSE: the latest `bars` bars, then only bars appended or updated as new minutes close."""
+    if not symbol:
+        return {"status": "error", "message": "Symbol is required"}
+    if not 1 <= bars <= MAX_LIVE_BARS:
+        return {"status": "error", "message": f"bars must be between 1 and {MAX_LIVE_BARS}"}
+    series = bar_store.series(asset, symbol, tf)
+    newest = bar_feed.position()
+    first = first_bar(series, newest, bars)
+    try:
+        check_work(series, first, bar_index(series, newest) - first + 1)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    # EventSource resends the last id as a header on reconnect; the query parameter is for other clients
+    resume = parse_event_id(request.headers.get("last-event-id") or last_event_id)
+    metadata = {"symbol": series.symbol, "timeframe": series.timeframe, "asset": asset}
+    return StreamingResponse(
+        live_stream(bar_feed, series, bars, metadata, resume),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Simulated L2 books, anchored to the same price path as the bars
+book_hub = BookHub()
+
+@app.on_event("shutdown")
+def stop_book_producers():
+    book_hub.close()
+
+@app.get("/api/mock/book")
+async def order_book(asset: str = "equities", symbol: str = "AAPL", depth: int = 50):
+    """Depth snapshot: the best `depth` levels per side, plus the seq the delta stream continues from."""
+    if not symbol:
+        return {"status": "error", "message": "Symbol is required"}
+    if not 1 <= depth <= BOOK_LEVELS:
+        return {"status": "error", "message": f"depth must be between 1 and {BOOK_LEVELS}"}
+    book = book_hub.book(asset, symbol)
+    book_hub.advance(book)
+    return {"status": "success", "data": book.snapshot(depth)}
+
+@app.get("/api/mock/book/stream")
+async def order_book_stream(request: Request, asset: str = "equities", symbol: str = "AAPL", last_event_id: str = None):
+    """SSE: a full-book snapshot, then every delta; Last-Event-ID resumes from the delta history."""
+    if not symbol:
+        return {"status": "error", "message": "Symbol is required"}
+    book = book_hub.book(asset, symbol)
+    resume = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        book_stream(book_hub, book, resume),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 if __name__ == "__main__":
-    import os
-    port = int(os.environ.get("PORT", 10000))
-    uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
+    # QDA_MODE=production: multi-worker, no reload, uvloop/httptools when installed
+    server.run("app:app")
@@ -0,0 +1,6 @@
+"""Standalone benchmarks. Run each module from the repo root with ``python -m benchmarks.<name>``."""
+import os
+
+# Benchmarks drive the app from a single client address; keep the rate
+# limiter out of their numbers unless it is switched on explicitly.
+os.environ.setdefault("QDA_RATE_LIMIT", "off")
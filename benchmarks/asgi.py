@@ -0,0 +1,104 @@
+"""Minimal in-process ASGI client used by the benchmarks (no network, no extra deps)."""
+import asyncio
+from urllib.parse import urlsplit
+
+
+async def request(app, path, method="GET", headers=None):
+    """Runs one HTTP request through the app and returns (status, headers, body)."""
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    status = None
+    response_headers = {}
+    chunks = []
+    sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a real client, stay connected until the response is complete.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for k, v in message.get("headers", []):
+                response_headers[k.decode().lower()] = v.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+class WebSocketSession:
+    """Client side of one in-process ASGI WebSocket connection.
+
+    on_message(text) is awaited for every frame the app sends; making it slow
+    simulates a slow consumer.
+    """
+
+    def __init__(self, app, path, on_message):
+        self.app = app
+        self.path = path
+        self.on_message = on_message
+        self.accepted = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.close_code = None
+        self._inbox = asyncio.Queue()
+        self._inbox.put_nowait({"type": "websocket.connect"})
+
+    async def run(self):
+        url = urlsplit(self.path)
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "scheme": "ws",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+            "subprotocols": [],
+        }
+        try:
+            await self.app(scope, self._inbox.get, self._send)
+        finally:
+            self.closed.set()
+
+    async def _send(self, message):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            await self.on_message(message.get("text") or message.get("bytes"))
+        elif message["type"] == "websocket.close":
+            self.close_code = message.get("code", 1000)
+            self.closed.set()
+
+    def send_text(self, text):
+        self._inbox.put_nowait({"type": "websocket.receive", "text": text})
+
+    def disconnect(self, code=1000):
+        self._inbox.put_nowait({"type": "websocket.disconnect", "code": code})
@@ -0,0 +1,182 @@
+"""Per-route throughput and latency of the whole app, in process, with baseline regression gates.
+
+    python -m benchmarks.bench_app [--requests 200] [--seconds 3] [--concurrency 1] [--routes blog,mock]
+    python -m benchmarks.bench_app --save baseline.json
+    python -m benchmarks.bench_app --compare baseline.json [--threshold 0.2] [--metric p95]
+
+Requests go through the full middleware stack via the ASGI interface, with no
+sockets involved. Each route is warmed up, then driven until --requests
+responses or --seconds have elapsed (whichever comes first, but at least
+MIN_REQUESTS). "fresh" mock routes clear the response cache before every
+request, so they time generation and serialization rather than a cache hit.
+
+--compare exits with status 1 if any route's --metric latency grew by more
+than --threshold (a fraction) relative to the baseline, or its throughput
+fell by the same fraction. Baselines are only comparable on the same machine.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+
+import app
+from benchmarks.asgi import request
+from quantdata import formats
+
+MIN_REQUESTS = 10
+METRICS = ("p50", "p95", "p99")
+
+# Range sizes for /api/mock/data at 5min bars: about 78, 2k and 25k bars
+MOCK_RANGES = {
+    "1d": ("2024-03-04", "2024-03-05"),
+    "30d": ("2024-03-01", "2024-03-31"),
+    "1y": ("2024-01-01", "2024-12-31"),
+}
+MOCK_FORMATS = ("json", "columnar", "arrow", "csv")
+
+
+class Scenario:
+    __slots__ = ("name", "path", "fresh")
+
+    def __init__(self, name, path, fresh=False):
+        self.name = name
+        self.path = path
+        self.fresh = fresh
+
+
+def scenarios():
+    """The representative route mix, built from the content actually on disk."""
+    store = app.blog_library.current()
+    category = next((c for c in store.grid if c != "All"), "All")
+    slug = store.posts[0].slug
+    mix = [
+        Scenario("home", "/"),
+        Scenario("blog index", "/blog"),
+        Scenario("blog search", "/blog?q=latency"),
+        Scenario("blog category", f"/blog?category={category}"),
+        Scenario("blog post", f"/blog/{slug}"),
+        Scenario("docs overview", "/docs"),
+        Scenario("docs quickstart", "/docs/quickstart"),
+        Scenario("docs api reference", "/docs/api-reference"),
+        Scenario("mock 30d json cached", "/api/mock/data?tf=5min&start=2024-03-01&end=2024-03-31&latency=none"),
+    ]
+    for label, (start, end) in MOCK_RANGES.items():
+        for fmt in MOCK_FORMATS:
+            if formats.negotiate(fmt, None) is None:
+                continue  # optional dependency not installed
+            path = f"/api/mock/data?tf=5min&start={start}&end={end}&format={fmt}&latency=none"
+            mix.append(Scenario(f"mock {label} {fmt} fresh", path, fresh=True))
+    return mix
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+
+async def check(scenario):
+    status, headers, body = await request(app.app, scenario.path)
+    if status != 200 or (headers.get("content-type", "").startswith("application/json") and body.startswith(b'{"status":"error"')):
+        raise RuntimeError(f"{scenario.name}: {scenario.path} answered {status}: {body[:200]!r}")
+
+
+async def run(scenario, requests, seconds, concurrency, warmup):
+    for _ in range(warmup):
+        await check(scenario)
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        while len(latencies) < requests and (len(latencies) < MIN_REQUESTS or time.perf_counter() < deadline):
+            if scenario.fresh:
+                app.result_cache.clear()
+            t0 = time.perf_counter_ns()
+            await request(app.app, scenario.path)
+            latencies.append(time.perf_counter_ns() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    ordered = sorted(latencies)
+    return {
+        "path": scenario.path,
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed, 2),
+        "mean": round(sum(ordered) / len(ordered) / 1e6, 4),
+        **{m: round(percentile(ordered, int(m[1:]) / 100) / 1e6, 4) for m in METRICS},
+    }
+
+
+def compare(results, baseline, metric, threshold):
+    """Prints the change per route against baseline; returns the names of regressed routes."""
+    regressed = []
+    print(f"\n{'route':<28} {metric + ' base':>10} {metric + ' now':>10} {'change':>8} {'rps change':>11}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28} {'(new)':>10}")
+            continue
+        latency = now[metric] / base[metric] - 1 if base[metric] else 0.0
+        throughput = now["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        failed = latency > threshold or throughput < -threshold
+        if failed:
+            regressed.append(name)
+        print(f"{name:<28} {base[metric]:>9.3f}ms {now[metric]:>9.3f}ms {latency:>+8.1%} {throughput:>+11.1%}"
+              + ("  REGRESSED" if failed else ""))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--seconds", type=float, default=3.0, help="time budget per route")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent in-process clients")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests per route")
+    parser.add_argument("--routes", help="comma-separated substrings; only matching route names run")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="JSON baseline to gate against")
+    parser.add_argument("--metric", choices=METRICS, default="p50")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed fractional regression")
+    args = parser.parse_args()
+
+    mix = scenarios()
+    if args.routes:
+        wanted = [w.strip() for w in args.routes.split(",") if w.strip()]
+        mix = [s for s in mix if any(w in s.name for w in wanted)]
+
+    results = {}
+    print(f"{'route':<28} {'reqs':>6} {'req/s':>10} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for scenario in mix:
+        result = asyncio.run(run(scenario, args.requests, args.seconds, args.concurrency, args.warmup))
+        results[scenario.name] = result
+        print(f"{scenario.name:<28} {result['requests']:>6} {result['rps']:>10.1f} "
+              f"{result['p50']:>7.3f}ms {result['p95']:>7.3f}ms {result['p99']:>7.3f}ms")
+
+    if args.save:
+        document = {
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "options": {"requests": args.requests, "seconds": args.seconds, "concurrency": args.concurrency},
+            "routes": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nSaved baseline for {len(results)} routes to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["routes"]
+        regressed = compare(results, baseline, args.metric, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} route(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+        print(f"\nNo route regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
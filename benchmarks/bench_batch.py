@@ -0,0 +1,68 @@
+"""N symbols as N /api/mock/data calls vs one /api/mock/batch call, with event-loop stalls.
+
+A ticker task sleeps in 5ms steps while the requests run; its worst overshoot
+is how long the event loop was blocked.
+
+    python -m benchmarks.bench_batch [--symbols 500] [--days 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app import app, batch_runner, result_cache
+from benchmarks.asgi import request
+
+TICK = 0.005
+
+
+async def watch_loop(stop):
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - t0 - TICK)
+    return worst
+
+
+async def timed(coro):
+    stop = asyncio.Event()
+    watcher = asyncio.ensure_future(watch_loop(stop))
+    t0 = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    return result, elapsed, await watcher
+
+
+async def run(n, days):
+    symbols = [f"S{i:03d}" for i in range(n)]
+    query = f"tf=5min&start=2024-01-01&end=2024-01-{1 + days:02d}&latency=none"
+    # Start the worker processes before timing.
+    await request(app, f"/api/mock/batch?symbols=WARM&{query}")
+
+    result_cache.clear()
+    singles = asyncio.gather(*(request(app, f"/api/mock/data?symbol={s}&{query}") for s in symbols))
+    results, elapsed, stall = await timed(singles)
+    assert all(status == 200 for status, _, _ in results)
+    print(f"{n} x /api/mock/data: {elapsed * 1000:8.1f}ms, worst loop stall {stall * 1000:6.1f}ms")
+
+    (status, _, body), elapsed, stall = await timed(request(app, f"/api/mock/batch?symbols={','.join(symbols)}&{query}"))
+    lines = body.splitlines()
+    assert status == 200 and len(lines) == n + 1
+    assert all(json.loads(line)["status"] == "success" for line in lines[1:])
+    print(f"1 x /api/mock/batch: {elapsed * 1000:8.1f}ms, worst loop stall {stall * 1000:6.1f}ms "
+          f"({batch_runner.workers} workers, {len(body) / 2**20:.1f} MiB)")
+    batch_runner.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.symbols, args.days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Blog store costs on archives much larger than the real one.
+
+Part 1 times listing, search and slug lookups on BlogStore against the
+original linear scans. Part 2 writes a synthetic on-disk archive and measures
+how long loading its metadata takes and how much memory it holds.
+
+    python -m benchmarks.bench_blog [--posts 20,1000,10000]
+"""
+import argparse
+import copy
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from app import blog_library
+from quantdata.blog import BlogStore
+from quantdata.content import load_posts
+
+
+def synthetic(n):
+    base = blog_library.current().posts
+    posts = []
+    for i in range(n):
+        p = copy.copy(base[i % len(base)])
+        p.slug = f"{p.slug}-{i}"
+        p.featured = i == 0
+        posts.append(p)
+    return posts
+
+
+def linear_query(posts, category, page, q):
+    """The pre-index blog_index body."""
+    filtered = posts
+    if q:
+        q_lower = q.lower()
+        filtered = [p for p in filtered if q_lower in p.title.lower() or q_lower in p.summary.lower()]
+    if category != "All":
+        filtered = [p for p in filtered if p.category == category]
+    grid = [p for p in filtered if not p.featured]
+    return grid[(page - 1) * 6:page * 6], (len(grid) + 5) // 6
+
+
+def per_call_us(fn, repeat=200):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def bench_queries(sizes):
+    print(f"{'posts':>7}  {'operation':<28}{'linear us':>12}{'store us':>12}")
+    for n in sizes:
+        posts = synthetic(n)
+        store = BlogStore(posts)
+        store.search("warmup")
+        last_slug = posts[-1].slug
+        cases = [
+            ("page 2, All", lambda: linear_query(posts, "All", 2, ""), lambda: store.query("All", 2, "")),
+            ("page 1, Engineering", lambda: linear_query(posts, "Engineering", 1, ""), lambda: store.query("Engineering", 1, "")),
+            ("search 'flatbuffers'", lambda: linear_query(posts, "All", 1, "flatbuffers"), lambda: store.query("All", 1, "flatbuffers")),
+            ("slug lookup (last post)", lambda: next(p for p in posts if p.slug == last_slug), lambda: store.get(last_slug)),
+        ]
+        for name, linear, indexed in cases:
+            print(f"{n:>7}  {name:<28}{per_call_us(linear):>12.1f}{per_call_us(indexed):>12.1f}")
+
+
+def bench_archive(sizes):
+    source = [open(p.path, encoding="utf-8").read() for p in blog_library.current().posts]
+    print(f"\n{'posts':>7}{'on disk MiB':>13}{'load ms':>10}{'held KiB':>10}{'KiB/post':>10}")
+    for n in sizes:
+        directory = tempfile.mkdtemp()
+        try:
+            size = 0
+            for i in range(n):
+                text = source[i % len(source)].replace("\nslug: ", f"\nslug: p{i}-", 1)
+                path = os.path.join(directory, f"{i:06d}.html")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                size += len(text)
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            posts = load_posts(directory)
+            elapsed = time.perf_counter() - t0
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(f"{n:>7}{size / 2**20:>13.1f}{elapsed * 1000:>10.1f}{held / 1024:>10.0f}{held / 1024 / len(posts):>10.2f}")
+        finally:
+            shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", default="20,1000,10000")
+    args = parser.parse_args()
+    sizes = [int(x) for x in args.posts.split(",")]
+    bench_queries(sizes)
+    bench_archive(sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Live bar feed: bytes per update against refetching the window, and fan-out cost per viewer.
+
+    python -m benchmarks.bench_feed [--bars 300] [--viewers 1,100,10000]
+"""
+import argparse
+import asyncio
+import time
+
+from quantdata import feed, formats, ohlc
+from quantdata.resample import open_series
+
+
+def refetch_bytes(series, bars, minute):
+    """Size of the /api/mock/data JSON body a polling chart downloads each time."""
+    window = feed.bars_through(series, feed.bar_index(series, minute) - bars + 1, minute)
+    return len(formats.encode_json({"status": "success", "metadata": {}, "data": ohlc.to_records(window)}))
+
+
+async def bench_fanout(series, viewers, updates):
+    # The producer never wakes; updates are pushed by hand, one closed minute each
+    bar_feed = feed.BarFeed(interval=3600, queue_size=updates + 1)
+    queues = [bar_feed.subscribe(series) for _ in range(viewers)]
+    start = bar_feed.position()
+    t0 = time.perf_counter()
+    for i in range(1, updates + 1):
+        bars = feed.bars_through(series, feed.bar_index(series, start + i), start + i)
+        bar_feed.broadcast((series.asset, series.symbol, series.timeframe), (start + i, feed.sse_event("bars", ohlc.to_records(bars), start + i)))
+    elapsed = time.perf_counter() - t0
+    for viewer in queues:
+        bar_feed.unsubscribe(series, viewer)
+    return elapsed / updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=300)
+    parser.add_argument("--timeframe", default="5min")
+    parser.add_argument("--viewers", default="1,100,10000")
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    series = open_series("equities", "AAPL", args.timeframe)
+    minute = feed.position(time.time())
+    update = feed.sse_event("bars", ohlc.to_records(feed.bars_through(series, feed.bar_index(series, minute), minute)), minute)
+    full = refetch_bytes(series, args.bars, minute)
+    print(f"refetch {args.bars} bars:     {full:>9,} bytes")
+    print(f"one live update:       {len(update):>9,} bytes ({full / len(update):,.0f}x smaller)")
+
+    for viewers in (int(v) for v in args.viewers.split(",")):
+        per_update = asyncio.run(bench_fanout(series, viewers, args.updates))
+        print(f"update to {viewers:>6} viewers: {per_update * 1000:9.3f} ms "
+              f"({per_update / viewers * 1e6:.2f} us/viewer, encoded once)")
+
+
+if __name__ == "__main__":
+    main()
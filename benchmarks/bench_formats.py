@@ -0,0 +1,64 @@
+"""Payload size and encode time of every /api/mock/data output format.
+
+    python -m benchmarks.bench_formats [--bars 1000,100000,1000000] [--timeframe 5min]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from quantdata import formats, ohlc
+from quantdata.resample import open_series
+
+
+def encoders():
+    yield "json rows", lambda bars, meta: json.dumps({"metadata": meta, "data": ohlc.to_records(bars)}).encode()
+    yield "json columns", lambda bars, meta: json.dumps({"metadata": meta, "data": ohlc.to_columns(bars)}).encode()
+    for fmt in formats.STREAMING_FORMATS:
+        encode = formats.STREAM_ENCODERS[fmt]
+        yield fmt, lambda bars, meta, encode=encode: "".join(encode([bars], meta)).encode()
+    for fmt in formats.BINARY_FORMATS:
+        if formats.negotiate(fmt, None):
+            yield fmt, formats.BINARY_ENCODERS[fmt]
+
+
+def check_columnar(bars, meta):
+    """decode_columnar must return exactly what encode_columnar packed, extra columns included."""
+    extra = {"sma20": np.linspace(0.0, 1.0, len(bars))}
+    metadata, columns = formats.decode_columnar(formats.encode_columnar(bars, meta, extra))
+    assert metadata == meta
+    assert list(columns) == list(ohlc.COLUMNS) + list(extra)
+    for name in ohlc.COLUMNS:
+        assert columns[name].dtype == np.dtype(formats.COLUMN_DTYPES[name])
+        assert np.array_equal(columns[name], getattr(bars, name))
+    assert np.array_equal(columns["sma20"], extra["sma20"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", default="1000,100000,1000000")
+    parser.add_argument("--timeframe", default="5min")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    series = open_series("equities", "AAPL", args.timeframe)
+    print(f"{'bars':>9}  {'format':<14}{'bytes':>14}{'bytes/bar':>11}{'encode ms':>11}{'vs json':>9}")
+    for n in (int(b) for b in args.bars.split(",")):
+        bars = series.window(5_000_000, n)
+        meta = {"symbol": "AAPL", "count": n}
+        baseline = None
+        for name, encode in encoders():
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                payload = encode(bars, meta)
+                best = min(best, time.perf_counter() - t0)
+            baseline = baseline or best
+            print(f"{n:>9}  {name:<14}{len(payload):>14,}{len(payload) / n:>11.1f}{best * 1000:>11.2f}{baseline / best:>8.1f}x")
+        check_columnar(bars, meta)
+    print("columnar payloads decode to the bars they encode")
+
+
+if __name__ == "__main__":
+    main()
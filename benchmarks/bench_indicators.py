@@ -0,0 +1,54 @@
+"""Indicator compute time per window size, and incremental appends vs full recomputes.
+
+    python -m benchmarks.bench_indicators [--bars 1000,100000,1000000] [--append 100]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from quantdata.indicators import compute, parse_indicators
+from quantdata.ohlc import OHLCBars
+from quantdata.resample import open_series
+
+SPECS = ("sma:20", "ema:20", "rsi:14", "vwap", "atr:14", "bb:20:2")
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", default="1000,100000,1000000")
+    parser.add_argument("--append", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    series = open_series("equities", "AAPL", "5min")
+    print(f"{'bars':>9}  {'indicator':<9}{'full ms':>10}{'append ms':>11}{'speedup':>9}")
+    for n in (int(b) for b in args.bars.split(",")):
+        bars = series.window(5_000_000, n + args.append)
+        head = OHLCBars(*(c[:n] for c in bars))
+        tail = OHLCBars(*(c[n:] for c in bars))
+        for spec in SPECS + (",".join(SPECS),):
+            indicators = parse_indicators(spec)
+            full_s = best_of(lambda: compute(indicators, bars), args.repeat)
+            _, states = compute(indicators, head)
+            append_s = best_of(lambda: compute(indicators, tail, states), args.repeat)
+
+            # Appending from the state must agree with the full pass.
+            full, _ = compute(indicators, bars)
+            appended, _ = compute(indicators, tail, states)
+            assert all(np.allclose(full[k][n:], appended[k], atol=1e-3, equal_nan=True) for k in full)
+            label = "all" if "," in spec else spec.split(":")[0]
+            print(f"{n:>9}  {label:<9}{full_s * 1000:>10.3f}{append_s * 1000:>11.3f}{full_s / append_s:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Concurrency check for the simulated latency on /api/mock/data.
+
+Fires N requests at once through the ASGI app. With an awaitable delay the
+batch finishes in roughly one delay; a blocking sleep would take N delays.
+
+    python -m benchmarks.bench_latency [--requests 20] [--latency fixed:0.3]
+"""
+import argparse
+import asyncio
+import time
+
+from app import app
+from benchmarks.asgi import request
+from quantdata.latency import parse_latency
+
+
+async def run(n, latency):
+    path = f"/api/mock/data?tf=daily&start=2024-01-01&end=2024-01-31&latency={latency}"
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(request(app, path) for _ in range(n)))
+    elapsed = time.perf_counter() - t0
+    assert all(status == 200 for status, _, _ in results)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0.3")
+    args = parser.parse_args()
+
+    delay = parse_latency(args.latency).seconds
+    elapsed = asyncio.run(run(args.requests, args.latency))
+    print(f"{args.requests} parallel requests, delay {delay:.3f}s: {elapsed:.3f}s total "
+          f"({elapsed / delay if delay else 0:.2f} delays; serial would be {args.requests})")
+    if delay and elapsed > delay * 2:
+        raise SystemExit("FAIL: requests were serialized by the simulated delay")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Cost of the instrumentation: Histogram.record(), the middleware round trip, and a /metrics scrape.
+
+    python -m benchmarks.bench_metrics [--requests 200000]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from starlette.routing import Route
+
+from benchmarks.asgi import request
+from quantdata.metrics import Histogram, Metrics, MetricsMiddleware
+
+
+async def hello(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def bench_record(n):
+    histogram = Histogram()
+    values = [random.randrange(1, 10**9) for _ in range(1000)]
+    t0 = time.perf_counter()
+    for i in range(n):
+        histogram.record(values[i % 1000])
+    elapsed = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for i in range(n):
+        values[i % 1000]
+    return elapsed - (time.perf_counter() - t0) / n
+
+
+async def bench_middleware(n, routes):
+    metrics = Metrics([Route(f"/r{i}/{{item}}", hello) for i in range(routes)])
+    wrapped = MetricsMiddleware(hello, metrics)
+    results = {}
+    for name, app in (("bare app", hello), ("instrumented", wrapped)):
+        t0 = time.perf_counter()
+        for i in range(n):
+            await request(app, f"/r{i % routes}/x")
+        results[name] = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    text = metrics.render()
+    results["scrape"] = time.perf_counter() - t0
+    return results, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--routes", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"Histogram.record():            {bench_record(args.requests) * 1e9:8.0f} ns")
+    results, size = asyncio.run(bench_middleware(args.requests // 10, args.routes))
+    print(f"ASGI round trip, bare app:     {results['bare app'] * 1e6:8.2f} us/request")
+    print(f"ASGI round trip, instrumented: {results['instrumented'] * 1e6:8.2f} us/request")
+    print(f"middleware overhead:           {(results['instrumented'] - results['bare app']) * 1e6:8.2f} us/request")
+    print(f"/metrics render, {args.routes} routes:   {results['scrape'] * 1000:8.2f} ms ({size:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
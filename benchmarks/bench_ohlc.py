@@ -0,0 +1,84 @@
+"""Bars/sec of the served columnar series against the original per-bar loop.
+
+    python -m benchmarks.bench_ohlc [--sizes 1000,100000,1000000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from quantdata import ohlc
+from quantdata.resample import open_series, rollups
+
+
+def legacy_loop(steps):
+    """The pre-NumPy generator body, without its 500-bar cap."""
+    data = []
+    current_time = datetime(2024, 1, 1)
+    delta = timedelta(minutes=5)
+    last_price = 150.0 + random.random() * 100.0
+    for _ in range(steps):
+        open_p = last_price
+        close_p = open_p + (random.random() - 0.5) * 4.0
+        high_p = max(open_p, close_p) + random.random() * 2.0
+        low_p = min(open_p, close_p) - random.random() * 2.0
+        volume = random.randint(100000, 1000000)
+        data.append({
+            "time": int(current_time.timestamp()),
+            "open": round(open_p, 2),
+            "high": round(high_p, 2),
+            "low": round(low_p, 2),
+            "close": round(close_p, 2),
+            "volume": volume
+        })
+        last_price = close_p
+        current_time += delta
+    return data
+
+
+def served_arrays(steps):
+    """The 5min series /api/mock/data serves, rolled up from 1-minute bars with a cold cache."""
+    rollups.clear()
+    return open_series("equities", "AAPL", "5min").window(1_000_000, steps)
+
+
+def served_records(steps):
+    return ohlc.to_records(served_arrays(steps))
+
+
+def served_columns(steps):
+    return ohlc.to_columns(served_arrays(steps))
+
+
+def best_of(fn, steps, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(steps)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("legacy loop", legacy_loop),
+        ("served arrays", served_arrays),
+        ("served rows", served_records),
+        ("served columns", served_columns),
+    ]
+    print(f"{'bars':>10}  {'variant':<16}{'seconds':>10}{'bars/sec':>16}{'speedup':>10}")
+    for steps in (int(s) for s in args.sizes.split(",")):
+        baseline = None
+        for name, fn in cases:
+            elapsed = best_of(fn, steps, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{steps:>10}  {name:<16}{elapsed:>10.4f}{steps / elapsed:>16,.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Order book simulator: updates/sec per book, best bid/ask queries, and snapshot cost by depth.
+
+    python -m benchmarks.bench_orderbook [--events 200000] [--depths 10,100,1000]
+"""
+import argparse
+import time
+
+from quantdata import formats
+from quantdata.orderbook import OrderBook
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def bench_steps(book, n):
+    target = book.reference()
+    changes, trades = {}, []
+    t0 = time.perf_counter()
+    for _ in range(n):
+        book.step(target, changes, trades)
+        if len(changes) > 1000:
+            changes.clear()
+            trades.clear()
+    return n / (time.perf_counter() - t0)
+
+
+def bench_advance(book, clock, n, per_delta):
+    """Events/sec through advance(), which also encodes each delta message."""
+    clock.now = book.updated
+    t0 = time.perf_counter()
+    for _ in range(n // per_delta):
+        clock.now += per_delta / book.rate
+        book.advance()
+    return n / (time.perf_counter() - t0)
+
+
+def bench_best(book, n):
+    bids, asks = book.bids, book.asks
+    t0 = time.perf_counter()
+    for _ in range(n):
+        bids.best()
+        asks.best()
+    return (time.perf_counter() - t0) / (2 * n)
+
+
+def dict_best(levels, n):
+    """The same query against a plain {price: size} dict per side, for comparison."""
+    t0 = time.perf_counter()
+    for _ in range(n):
+        max(levels)
+    return (time.perf_counter() - t0) / n
+
+
+def bench_snapshot(book, depth, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        snapshot = book.snapshot(depth)
+    build = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        body = formats.encode_json({"status": "success", "data": snapshot})
+    return build, (time.perf_counter() - t0) / n, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--depths", default="10,100,1000")
+    parser.add_argument("--levels", type=int, default=1000, help="resting levels per side")
+    args = parser.parse_args()
+
+    clock = Clock()
+    book = OrderBook("equities", "AAPL", levels=args.levels, clock=clock)
+    print(f"book: {len(book.bids)} bid / {len(book.asks)} ask levels")
+    print(f"step() alone:                 {bench_steps(book, args.events):>10,.0f} events/s")
+    for per_delta in (1, 5, 50):
+        rate = bench_advance(book, clock, args.events // 2, per_delta)
+        print(f"advance(), {per_delta:>2} events/delta:    {rate:>10,.0f} events/s")
+
+    best = bench_best(book, args.events)
+    prices, _ = book.bids.depth(args.levels)
+    as_dict = dict.fromkeys(prices.tolist(), 100)
+    print(f"best bid/ask:                 {best * 1e9:>10.0f} ns (dict + max(): {dict_best(as_dict, 2000) * 1e9:,.0f} ns)")
+
+    print(f"\n{'depth':>6} {'snapshot()':>12} {'encode_json':>12} {'bytes':>9}")
+    for depth in (int(d) for d in args.depths.split(",")):
+        build, encode, size = bench_snapshot(book, depth, max(50, 20_000 // depth))
+        print(f"{depth:>6} {build * 1e6:>10.1f}us {encode * 1e6:>10.1f}us {size:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Throughput of cached static pages against the same routes rendering per request.
+
+    python -m benchmarks.bench_pages [--requests 2000]
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+
+from app import app, templates
+from benchmarks.asgi import request
+
+PAGES = [
+    ("/docs", "docs/overview.html", {"page": "overview", "title": "Overview"}),
+    ("/pricing", "pricing.html", {"page": "pricing"}),
+    ("/docs/limits", "docs/limits.html", {"page": "limits", "title": "Rate Limits"}),
+    ("/terms", "terms.html", {"page": "terms"}),
+]
+
+
+def uncached_app():
+    """The pre-cache handlers: a TemplateResponse per request."""
+    baseline = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+    for path, template, context in PAGES:
+        async def handler(request: Request, template=template, context=context):
+            return templates.TemplateResponse(template, {"request": request, **context})
+        baseline.add_api_route(path, handler)
+    return baseline
+
+
+async def served_per_sec(target, path, n, encoding):
+    headers = {"accept-encoding": encoding}
+    await request(target, path, headers=headers)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await request(target, path, headers=headers)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    baseline = uncached_app()
+    print(f"{'path':<16}{'render req/s':>14}{'cached req/s':>14}{'cached gzip req/s':>19}")
+    for path, _, _ in PAGES:
+        rendered = asyncio.run(served_per_sec(baseline, path, args.requests, "identity"))
+        identity = asyncio.run(served_per_sec(app, path, args.requests, "identity"))
+        gzipped = asyncio.run(served_per_sec(app, path, args.requests, "gzip"))
+        print(f"{path:<16}{rendered:>14,.0f}{identity:>14,.0f}{gzipped:>19,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Cost of fetching page K of a long range through /api/mock/data (should be flat in K).
+
+    python -m benchmarks.bench_pagination [--limit 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app import app
+from benchmarks.asgi import request
+
+BASE = "/api/mock/data?symbol=AAPL&tf=5min&start=2000-01-01&end=2024-01-01&latency=none"
+
+
+async def fetch(path):
+    status, _, body = await request(app, path)
+    assert status == 200, body[:200]
+    return json.loads(body)
+
+
+async def run(limit, pages):
+    cursor = None
+    print(f"{'page':>6}{'first bar time':>16}{'ms':>10}")
+    for page in range(1, pages + 1):
+        path = f"{BASE}&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        t0 = time.perf_counter()
+        result = await fetch(path)
+        elapsed = time.perf_counter() - t0
+        if page in (1, 2, 10, pages) or page % 100 == 0:
+            print(f"{page:>6}{result['data'][0]['time']:>16}{elapsed * 1000:>10.2f}")
+        cursor = result["metadata"]["next_cursor"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.limit, args.pages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Profiler overhead: middleware cost when off, and workload slowdown while sampling.
+
+    python -m benchmarks.bench_profiler [--requests 20000] [--work 200]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.asgi import request
+from quantdata.profiler import Profiler, ProfilerMiddleware
+from quantdata.resample import open_series
+
+
+async def hello(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def bench_middleware(n):
+    wrapped = ProfilerMiddleware(hello, Profiler())
+    results = {}
+    for name, app in (("bare app", hello), ("profiler off", wrapped)):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            await request(app, "/api/mock/data")
+        results[name] = (time.perf_counter() - t0) / n
+    return results
+
+
+def workload(n):
+    series = open_series("equities", "AAPL", "1min")
+    t0 = time.perf_counter()
+    for i in range(n):
+        series.window(i * 5000, 5000)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--work", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(bench_middleware(args.requests))
+    for name, seconds in results.items():
+        print(f"ASGI round trip, {name:<12}: {seconds * 1e6:8.2f} us/request")
+
+    baseline = workload(args.work)
+    print(f"workload, no profiler:      {baseline * 1000:8.1f} ms")
+    for interval in (0.01, 0.005, 0.001):
+        profiler = Profiler()
+        session = profiler.start(seconds=3600, interval=interval)
+        elapsed = workload(args.work)
+        profiler.finish()
+        print(f"workload, sampling {interval * 1000:>4g}ms: {elapsed * 1000:8.1f} ms "
+              f"({elapsed / baseline - 1:+.1%}, {session.samples} samples)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Per-request overhead of the rate limiter: bare check(), and the middleware around a trivial ASGI app.
+
+    python -m benchmarks.bench_ratelimit [--requests 200000] [--clients 1,1000,100000]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from benchmarks.asgi import request
+from quantdata.ratelimit import ANONYMOUS, RateLimiter, RateLimitMiddleware, Tier
+
+# Generous enough that nothing is refused: the numbers are pure bookkeeping.
+UNLIMITED = Tier(10**9, 0)
+
+
+async def hello(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def bench_check(n, clients):
+    limiter = RateLimiter(anonymous=UNLIMITED)
+    identities = [f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(clients)]
+    t0 = time.perf_counter()
+    for i in range(n):
+        limiter.check(identities[i % clients], UNLIMITED)
+    return (time.perf_counter() - t0) / n
+
+
+def bench_threads(n, threads):
+    limiter = RateLimiter(anonymous=UNLIMITED)
+
+    def worker(k):
+        for i in range(n // threads):
+            limiter.check(f"ip:{k}.{i % 1000}", UNLIMITED)
+
+    pool = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return (time.perf_counter() - t0) / n
+
+
+async def bench_middleware(n):
+    wrapped = RateLimitMiddleware(hello, RateLimiter(anonymous=UNLIMITED), enabled=True)
+    results = {}
+    for name, app in (("bare app", hello), ("with limiter", wrapped)):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            await request(app, "/api/mock/data")
+        results[name] = (time.perf_counter() - t0) / n
+    status, headers, _ = await request(RateLimitMiddleware(hello, RateLimiter(), enabled=True), "/api/x")
+    assert status == 200 and headers["x-ratelimit-limit"] == str(ANONYMOUS.per_minute)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--clients", default="1,1000,100000")
+    args = parser.parse_args()
+
+    for clients in (int(c) for c in args.clients.split(",")):
+        print(f"check(), {clients:>7,} clients: {bench_check(args.requests, clients) * 1e9:8.0f} ns/request")
+    for threads in (1, 4):
+        print(f"check(), {threads} thread(s):       {bench_threads(args.requests, threads) * 1e9:8.0f} ns/request")
+    results = asyncio.run(bench_middleware(args.requests // 10))
+    for name, seconds in results.items():
+        print(f"ASGI round trip, {name:<12}: {seconds * 1e6:8.2f} us/request")
+    print(f"middleware overhead:           {(results['with limiter'] - results['bare app']) * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
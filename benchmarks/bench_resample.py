@@ -0,0 +1,52 @@
+"""Rolled-up timeframes: cold vs warm window cost, and cross-timeframe consistency.
+
+    python -m benchmarks.bench_resample [--days 365]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from quantdata.ohlc import TIMEFRAMES
+from quantdata.resample import open_series, resample, rollups
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    end = datetime(2024, 6, 1)
+    start = end - timedelta(days=args.days)
+    print(f"{'timeframe':>10}{'bars':>10}{'cold ms':>10}{'warm ms':>10}")
+    for tf in TIMEFRAMES:
+        rollups.clear()
+        series = open_series("equities", "AAPL", tf)
+        first, count = series.index_range(start, end)
+        if tf == "1min":
+            count = min(count, 100_000)
+        _, cold = timed(lambda: series.window(first, count))
+        _, warm = timed(lambda: series.window(first, count))
+        print(f"{tf:>10}{count:>10,}{cold * 1000:>10.2f}{warm * 1000:>10.2f}")
+
+    # Every coarser bar must equal the aggregate of the finer bars inside it.
+    daily = open_series("equities", "AAPL", "daily")
+    five = open_series("equities", "AAPL", "5min")
+    first, count = daily.index_range(start, end)
+    days = daily.window(first, count)
+    fives = five.window(first * 288, count * 288)
+    rolled = resample(fives, 288)
+    assert all(np.array_equal(getattr(days, f), getattr(rolled, f)) for f in days._fields)
+    print(f"{count} daily bars match their 5min bars")
+    print(rollups.snapshot())
+
+
+if __name__ == "__main__":
+    main()
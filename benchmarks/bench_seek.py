@@ -0,0 +1,46 @@
+"""Window cost of the served series at increasing offsets (should be flat).
+
+    python -m benchmarks.bench_seek [--length 1000] [--timeframe 5min]
+
+"cold" clears the rollup cache before every window, so it includes rolling
+the chunks up from 1-minute bars; "warm" reads chunks already cached.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from quantdata.resample import open_series, rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=1000)
+    parser.add_argument("--timeframe", default="5min")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    series = open_series("equities", "AAPL", args.timeframe)
+    print(f"{'offset':>14}{'cold ms':>10}{'warm ms':>10}")
+    for offset in (0, 10**4, 10**6, 10**8, 10**10):
+        timings = []
+        for cold in (True, False):
+            best = float("inf")
+            for _ in range(args.repeat):
+                if cold:
+                    rollups.clear()
+                t0 = time.perf_counter()
+                series.window(offset, args.length)
+                best = min(best, time.perf_counter() - t0)
+            timings.append(best)
+        print(f"{offset:>14,}{timings[0] * 1000:>10.3f}{timings[1] * 1000:>10.3f}")
+
+    # Overlapping windows must agree bar for bar.
+    whole = series.window(10**6, 4 * args.length)
+    part = series.window(10**6 + args.length, args.length)
+    assert all(np.array_equal(getattr(whole, f)[args.length:2 * args.length], getattr(part, f)) for f in whole._fields)
+    print("overlapping windows agree")
+
+
+if __name__ == "__main__":
+    main()
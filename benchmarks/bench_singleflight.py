@@ -0,0 +1,41 @@
+"""Identical concurrent /api/mock/data requests against a cold cache.
+
+With coalescing, N simultaneous misses render once: one leader, N - 1 coalesced.
+
+    python -m benchmarks.bench_singleflight [--requests 50] [--days 60]
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app import app, mock_flights, result_cache
+from benchmarks.asgi import request
+
+
+async def run(n, days):
+    start = date(2023, 1, 1)
+    end = start + timedelta(days=days)
+    path = f"/api/mock/data?symbol=AAPL&tf=5min&start={start}&end={end}&latency=none"
+    result_cache.clear()
+    before = dict(mock_flights.stats)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(request(app, path) for _ in range(n)))
+    elapsed = time.perf_counter() - t0
+    assert all(status == 200 for status, _, _ in results)
+    assert len({headers["etag"] for _, headers, _ in results}) == 1
+    stats = {k: v - before[k] for k, v in mock_flights.stats.items()}
+    print(f"{n} identical requests in {elapsed * 1000:.1f}ms: "
+          f"{stats['leaders']} render(s), {stats['coalesced']} coalesced, {stats['errors']} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Time from launching `python app.py` to its first served response, per mode.
+
+    python -m benchmarks.bench_startup [--runs 3] [--modes development,production]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url, timeout=5):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def launch(mode, timeout):
+    """Starts one server; returns (seconds to first 200 on /, first-request seconds, reported stats)."""
+    port = free_port()
+    env = dict(os.environ, QDA_MODE=mode, PORT=str(port), HOST="127.0.0.1", QDA_WORKERS="1")
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "app.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if time.perf_counter() - t0 > timeout:
+                raise RuntimeError(f"{mode} server did not answer within {timeout}s")
+            try:
+                t1 = time.perf_counter()
+                status, _ = get(base + "/", timeout=timeout)
+            except OSError:
+                time.sleep(0.01)
+                continue
+            if status == 200:
+                ready = time.perf_counter() - t0
+                first = time.perf_counter() - t1
+                break
+        _, body = get(base + "/api/mock/stats")
+        return ready, first, json.loads(body)["server"]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default="development,production")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    for mode in args.modes.split(","):
+        for _ in range(args.runs):
+            ready, first, reported = launch(mode, args.timeout)
+            print(f"{mode:<12} first response {ready * 1000:7.0f} ms after launch "
+                  f"(GET / took {first * 1000:5.1f} ms; worker ready {reported['ready_s'] * 1000:5.0f} ms "
+                  f"after its start, warm-up {reported['warm_up_ms']:5.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
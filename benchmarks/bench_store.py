@@ -0,0 +1,57 @@
+"""Range-query latency on memory-mapped store files of increasing size, vs the generator.
+
+    python -m benchmarks.bench_store [--bars 10000,1000000,10000000] [--window 1000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from quantdata.formats import encode_columnar
+from quantdata.resample import open_series, rollups
+from quantdata.store import BarStore, build
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", default="10000,100000,1000000")
+    parser.add_argument("--window", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    end = datetime(2024, 6, 1)
+    print(f"{'file bars':>12}{'file MiB':>10}{'build s':>9}{'store ms':>10}{'+encode ms':>12}{'generate ms':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        store = BarStore(directory)
+        for n in (int(x) for x in args.bars.split(",")):
+            symbol = f"B{n}"
+            t0 = time.perf_counter()
+            path, count = build(store, "equities", symbol, "5min", end - timedelta(minutes=5 * (n - 1)), end)
+            built = time.perf_counter() - t0
+
+            stored = store.series("equities", symbol, "5min")
+            generated = open_series("equities", symbol, "5min")
+            first = stored.times[0] // stored.step
+            offsets = [first + random.randrange(max(1, count - args.window)) for _ in range(args.repeat)]
+            it = iter(offsets * 3)
+            store_s = best_of(lambda: stored.window(next(it), args.window), args.repeat)
+            encoded_s = best_of(lambda: encode_columnar(stored.window(next(it), args.window), {}), args.repeat)
+            # The generator is timed cold: the rollup cache would otherwise answer for it.
+            gen_s = best_of(lambda: (rollups.clear(), generated.window(next(it), args.window)), args.repeat)
+            print(f"{count:>12,}{os.path.getsize(path) / 2**20:>10.1f}{built:>9.2f}"
+                  f"{store_s * 1000:>10.3f}{encoded_s * 1000:>12.3f}{gen_s * 1000:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Time-to-first-byte and peak memory of the streaming formats across range sizes.
+
+    python -m benchmarks.bench_stream [--days 1,30,365,1000]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from app import stream_mock_ohlc
+from quantdata import formats
+
+
+def measure(fmt, days):
+    end = date(2024, 1, 1)
+    start = end - timedelta(days=days)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    count, chunks, _ = stream_mock_ohlc("AAPL", "5min", start.isoformat(), end.isoformat())
+    stream = formats.STREAM_ENCODERS[fmt](chunks, {"count": count})
+    # Skip the metadata/column header lines and time the first bar data.
+    header_lines = 2 if fmt == "csv" else 1
+    ttfb = None
+    size = 0
+    for i, piece in enumerate(stream):
+        if i == header_lines:
+            ttfb = time.perf_counter() - t0
+        size += len(piece)
+    total = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, ttfb or total, total, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", default="1,30,365,1000")
+    args = parser.parse_args()
+
+    print(f"{'format':<8}{'days':>6}{'bars':>10}{'ttfb ms':>10}{'total s':>10}{'peak MiB':>10}{'body MiB':>10}")
+    for fmt in formats.STREAMING_FORMATS:
+        for days in (int(d) for d in args.days.split(",")):
+            count, ttfb, total, peak, size = measure(fmt, days)
+            print(f"{fmt:<8}{days:>6}{count:>10}{ttfb * 1000:>10.2f}{total:>10.3f}{peak / 2**20:>10.2f}{size / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Load test for the /ws/ticks fan-out: many connections, delivery latency percentiles.
+
+Connections are driven in-process through the ASGI interface, so thousands of
+them fit in one process without sockets. A fraction can be made deliberately
+slow to show they are conflated/evicted without stalling the producers.
+
+    python -m benchmarks.bench_ws [--connections 5000] [--symbols 20] [--slow 0.01]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from app import app, tick_hub
+from benchmarks.asgi import WebSocketSession
+
+
+async def run(args):
+    latencies = []
+    tick_hub.interval = args.interval
+
+    def make_handler(slow):
+        async def on_message(text):
+            message = json.loads(text)
+            if message.get("type") == "tick":
+                if slow:
+                    await asyncio.sleep(args.interval * 20)
+                else:
+                    latencies.append(time.time() - message["ts"])
+        return on_message
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    sessions = []
+    tasks = []
+    for i in range(args.connections):
+        session = WebSocketSession(app, "/ws/ticks", make_handler(random.random() < args.slow))
+        sessions.append(session)
+        tasks.append(asyncio.create_task(session.run()))
+        await session.accepted.wait()
+        session.send_text(json.dumps({"action": "subscribe", "symbols": [random.choice(symbols)]}))
+
+    latencies.clear()
+    stats_before = dict(tick_hub.stats)
+    await asyncio.sleep(args.duration)
+    stats = {k: v - stats_before[k] for k, v in tick_hub.stats.items()}
+
+    for session in sessions:
+        session.disconnect()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    expected_ticks = args.symbols * args.duration / args.interval
+    lat_ms = np.array(latencies) * 1000
+    print(f"connections {args.connections}, symbols {args.symbols}, interval {args.interval * 1000:.0f}ms, duration {args.duration}s")
+    print(f"ticks produced {stats['ticks']} (expected ~{expected_ticks:.0f}), delivered {stats['delivered']}, "
+          f"conflated {stats['conflated']}, evicted {stats['evicted']}")
+    if len(lat_ms):
+        p50, p95, p99 = np.percentile(lat_ms, [50, 95, 99])
+        print(f"delivery latency ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {lat_ms.max():.2f}  (n={len(lat_ms)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--slow", type=float, default=0.01, help="fraction of deliberately slow consumers")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
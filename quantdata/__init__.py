@@ -0,0 +1 @@
+"""Data engines backing the QuantDataApi mock endpoints."""
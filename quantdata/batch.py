@@ -0,0 +1,104 @@
+"""Multi-symbol batches rendered in a process pool.
+
+A batch shares one timeframe and range across many symbols. Each symbol is
+generated and serialized to a complete NDJSON line inside a worker process,
+so the event loop only forwards finished bytes; lines are streamed in the
+order symbols finish, after a metadata header line. The pool uses the spawn
+start method and is created on first use. Spawned workers re-import the
+parent's __main__ module, which is app.py itself under `python app.py`, so
+each worker pays for importing the whole app once when it starts.
+
+Every web worker has its own pool. By default each pool gets that web
+worker's share of the usable CPUs (affinity mask and cgroup quota, divided by
+the web worker count), so N web workers never start N x cpu_count processes.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from quantdata import ohlc
+from quantdata.server import available_cpus, worker_count
+
+BATCH_WORKERS = int(os.environ.get("QDA_BATCH_WORKERS", 0)) or max(1, available_cpus() // worker_count())
+MAX_SYMBOLS = int(os.environ.get("QDA_BATCH_MAX_SYMBOLS", 500))
+
+_store = None
+
+
+def parse_symbols(spec):
+    """Comma-separated symbols, upper-cased and de-duplicated in order."""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in (spec or "").split(",") if s.strip()))
+    if not symbols:
+        raise ValueError("symbols is required")
+    if len(symbols) > MAX_SYMBOLS:
+        raise ValueError(f"At most {MAX_SYMBOLS} symbols per batch")
+    return symbols
+
+
+def render_symbol(asset, symbol, timeframe, first, count, layout):
+    """Runs in a worker: one symbol's window as an NDJSON line."""
+    global _store
+    if _store is None:
+        from quantdata.store import BarStore
+        _store = BarStore()
+    bars = _store.series(asset, symbol, timeframe).window(first, count)
+    data = ohlc.to_columns(bars) if layout == "columns" else ohlc.to_records(bars)
+    line = {"symbol": symbol, "status": "success", "count": count, "data": data}
+    return (json.dumps(line, separators=(",", ":")) + "\n").encode()
+
+
+class BatchRunner:
+    """Fans symbols out over a lazily created process pool."""
+
+    def __init__(self, workers=BATCH_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self.stats = {"batches": 0, "symbols": 0, "errors": 0}
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def _render(self, asset, symbol, timeframe, first, count, layout):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, render_symbol, asset, symbol, timeframe, first, count, layout)
+        except BrokenProcessPool:
+            # A worker died; release the broken pool's processes and let the next batch start a fresh one.
+            # Other symbols of the batch fail on the same pool; only the first one to notice replaces it.
+            if self._pool is pool:
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            message = "Worker pool failed"
+        except Exception as e:
+            message = str(e) or type(e).__name__
+        self.stats["errors"] += 1
+        return (json.dumps({"symbol": symbol, "status": "error", "message": message}) + "\n").encode()
+
+    async def stream(self, asset, symbols, timeframe, first, count, layout, metadata):
+        """Metadata line, then one line per symbol as each finishes."""
+        self.stats["batches"] += 1
+        self.stats["symbols"] += len(symbols)
+        yield (json.dumps({"status": "success", "metadata": metadata}) + "\n").encode()
+        tasks = [asyncio.ensure_future(self._render(asset, s, timeframe, first, count, layout)) for s in symbols]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            # Client went away: drop symbols that have not started yet.
+            for task in tasks:
+                task.cancel()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def snapshot(self):
+        return dict(self.stats, workers=self.workers, running=self._pool is not None)
@@ -0,0 +1,118 @@
+"""Indexed, read-only view over the blog posts.
+
+Everything the listing routes need is computed once when the store is built:
+slug lookup, per-category lists and the paginated grids for every
+(category, page) pair. The inverted index over title, summary and content is
+built on the first search, so post bodies are not read until then. A search
+touches only the vocabulary range matching each query prefix and the postings
+under it, so its cost follows the number of matches rather than the size of
+the archive.
+
+Posts are records with attribute access (see quantdata.content.Post); the
+body is read through read_content() when indexing.
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+
+PER_PAGE = 6
+ALL = "All"
+
+# Field weights for ranking; an exact token match counts double a prefix match.
+FIELD_WEIGHTS = (("title", 3.0), ("summary", 2.0), ("content", 1.0))
+EXACT_BONUS = 2.0
+
+_TAG = re.compile(r"<[^>]+>")
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(_TAG.sub(" ", text or "").lower())
+
+
+class BlogStore:
+    def __init__(self, posts, per_page=PER_PAGE):
+        self.posts = list(posts)
+        self.per_page = per_page
+        self.by_slug = {p.slug: p for p in self.posts}
+        self.featured = next((p for p in self.posts if p.featured), None)
+
+        # The grid never shows featured posts; keep it precomputed per category.
+        self.grid = defaultdict(list)
+        for p in self.posts:
+            if not p.featured:
+                self.grid[ALL].append(p)
+                self.grid[p.category].append(p)
+        self._pages = {}
+        for category, posts in self.grid.items():
+            for page, start in enumerate(range(0, len(posts), per_page), 1):
+                self._pages[(category, page)] = posts[start:start + per_page]
+
+        self._vocabulary = None
+        self._postings = None
+
+    def _build_index(self):
+        """token -> {post position: weighted term frequency}, plus the sorted vocabulary."""
+        postings = defaultdict(lambda: defaultdict(float))
+        for pos, p in enumerate(self.posts):
+            fields = {"title": p.title, "summary": p.summary, "content": p.read_content()}
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(fields[field]):
+                    postings[token][pos] += weight
+        self._postings = {token: dict(hits) for token, hits in postings.items()}
+        self._vocabulary = sorted(self._postings)
+
+    def get(self, slug):
+        return self.by_slug.get(slug)
+
+    def page(self, category=ALL, page=1):
+        """(posts, total pages) for one precomputed grid page."""
+        total = len(self.grid.get(category, ()))
+        return self._pages.get((category, page), []), (total + self.per_page - 1) // self.per_page
+
+    def recent(self, n):
+        return self.grid[ALL][:n]
+
+    def related(self, slug, n=6):
+        return list(islice((p for p in self.posts if p.slug != slug), n))
+
+    def _expand(self, prefix):
+        """Vocabulary tokens starting with prefix, via binary search."""
+        i = bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            yield self._vocabulary[i]
+            i += 1
+
+    def search(self, query):
+        """Posts matching every query term as a token prefix, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        if self._postings is None:
+            self._build_index()
+        scores = None
+        for term in terms:
+            term_scores = defaultdict(float)
+            for token in self._expand(term):
+                bonus = EXACT_BONUS if token == term else 1.0
+                for pos, weight in self._postings[token].items():
+                    term_scores[pos] += weight * bonus
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pos: s + term_scores[pos] for pos, s in scores.items() if pos in term_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda pos: (-scores[pos], pos))
+        return [self.posts[pos] for pos in ranked]
+
+    def query(self, category=ALL, page=1, q=""):
+        """(grid posts, total pages) for a blog listing request."""
+        if not q:
+            return self.page(category, page)
+        hits = [p for p in self.search(q) if not p.featured]
+        if category != ALL:
+            hits = [p for p in hits if p.category == category]
+        start = (page - 1) * self.per_page
+        return hits[start:start + self.per_page], (len(hits) + self.per_page - 1) // self.per_page
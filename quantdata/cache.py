@@ -0,0 +1,87 @@
+"""Bounded in-process cache of serialized responses.
+
+Entries hold the encoded body plus a strong ETag (a hash of those bytes).
+Eviction is LRU by total body size; entries may also carry a TTL. All access
+happens on the event loop thread, so no locking is needed.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+CACHE_BYTES = int(os.environ.get("QDA_CACHE_BYTES", 64 * 1024 * 1024))
+# TTL for windows that reach the present; historical windows never expire.
+LIVE_TTL = float(os.environ.get("QDA_CACHE_LIVE_TTL", 5.0))
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: str
+    etag: str
+    expires: Optional[float]
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value covers etag."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or "W/" + etag in candidates
+
+
+class ResponseCache:
+    """LRU cache of CachedResponse bounded by total body bytes."""
+
+    def __init__(self, max_bytes=CACHE_BYTES, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        # A single entry may use at most a quarter of the budget.
+        self.max_entry_bytes = max_bytes // 4
+        self.clock = clock
+        self.size = 0
+        self._entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "uncacheable": 0}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if entry.expires is not None and entry.expires <= self.clock():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry
+
+    def put(self, key, body, media_type, ttl=None):
+        """Stores body (unless it is too large) and returns its CachedResponse either way."""
+        entry = CachedResponse(body, media_type, make_etag(body), None if ttl is None else self.clock() + ttl)
+        if len(body) > self.max_entry_bytes:
+            self.stats["uncacheable"] += 1
+            return entry
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+        return entry
+
+    def _remove(self, key):
+        self.size -= len(self._entries.pop(key).body)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def snapshot(self):
+        return dict(self.stats, entries=len(self._entries), bytes=self.size, max_bytes=self.max_bytes)
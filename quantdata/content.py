@@ -0,0 +1,135 @@
+"""On-disk blog content: one file per post, front matter followed by the body.
+
+    ---
+    id: 6
+    slug: zero-copy-serialization
+    title: Zero-Copy Serialization in Financial APIs
+    featured: false
+    ...
+    ---
+    <h2>The Serialization Challenge</h2>
+
+Bodies are .html, or .md when the optional markdown package is installed.
+Only the front matter is read up front, into compact __slots__ records; a
+post's body is read on first access and kept in a bounded LRU cache.
+"""
+import html
+import os
+import time
+from functools import lru_cache
+
+from quantdata.blog import BlogStore
+
+try:
+    import markdown
+except ImportError:  # Markdown bodies are optional
+    markdown = None
+
+CONTENT_CACHE_SIZE = int(os.environ.get("QDA_CONTENT_CACHE", 64))
+CHECK_INTERVAL = 1.0
+EXTENSIONS = (".html", ".md")
+
+
+class Post:
+    """Front-matter metadata for one post; the body stays on disk until asked for."""
+    __slots__ = (
+        "id", "slug", "title", "date", "author_name", "author_role", "read_time",
+        "category", "featured", "image", "summary", "content_intro", "path", "body_offset",
+    )
+
+    def __init__(self, path, body_offset, fields):
+        self.path = path
+        self.body_offset = body_offset
+        for name in self.__slots__[:-2]:
+            setattr(self, name, fields.get(name, ""))
+        self.id = int(self.id or 0)
+        self.featured = self.featured == "true"
+
+    @property
+    def content(self):
+        """Rendered body HTML, via the shared LRU cache."""
+        return _cached_body(self.path, self.body_offset)
+
+    def read_content(self):
+        """Rendered body HTML, bypassing the cache (used when indexing)."""
+        return read_body(self.path, self.body_offset)
+
+    def __repr__(self):
+        return f"Post({self.slug!r})"
+
+
+def read_front_matter(path):
+    """Returns (fields, body byte offset) without reading the body."""
+    fields = {}
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"---":
+            raise ValueError(f"{path}: missing front matter")
+        for raw in f:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.strip() == "---":
+                return fields, f.tell()
+            key, sep, value = line.partition(":")
+            if sep:
+                fields[key.strip()] = value.strip()
+    raise ValueError(f"{path}: unterminated front matter")
+
+
+def read_body(path, offset):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        text = f.read().decode("utf-8")
+    if path.endswith(".md"):
+        if markdown is not None:
+            return markdown.markdown(text)
+        return f"<pre>{html.escape(text)}</pre>"
+    return text
+
+
+@lru_cache(maxsize=CONTENT_CACHE_SIZE)
+def _cached_body(path, offset):
+    return read_body(path, offset)
+
+
+def _post_files(directory):
+    with os.scandir(directory) as entries:
+        return sorted((e for e in entries if e.is_file() and e.name.endswith(EXTENSIONS)), key=lambda e: e.name)
+
+
+def load_posts(directory):
+    """All posts under directory, ordered by id."""
+    posts = []
+    for entry in _post_files(directory):
+        fields, offset = read_front_matter(entry.path)
+        posts.append(Post(entry.path, offset, fields))
+    return sorted(posts, key=lambda p: p.id)
+
+
+def signature(directory):
+    """Changes whenever a post file is added, removed or modified."""
+    return tuple((e.name, e.stat().st_mtime_ns) for e in _post_files(directory))
+
+
+class PostLibrary:
+    """Keeps a BlogStore in sync with a content directory (checked at most once a second)."""
+
+    def __init__(self, directory, check_interval=CHECK_INTERVAL):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.version = 0
+        self._signature = None
+        self._checked = 0.0
+        self.store = None
+        self.current()
+
+    def current(self):
+        now = time.monotonic()
+        if self.store is not None and now - self._checked < self.check_interval:
+            return self.store
+        self._checked = now
+        sig = signature(self.directory)
+        if sig != self._signature:
+            self._signature = sig
+            self.store = BlogStore(load_posts(self.directory))
+            self.version += 1
+            _cached_body.cache_clear()
+        return self.store
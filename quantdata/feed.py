@@ -0,0 +1,199 @@
+"""Live bars over Server-Sent Events for /api/mock/live.
+
+The mock series are deterministic, so "live" only means revealing them as
+wall-clock time passes. The feed position is the epoch minute of the latest
+closed 1-minute bar. The bar containing it is shown as far as that minute:
+the rollup of its closed minutes, with the same aggregation ResampledSeries
+uses, so when its last minute closes it equals the historical bar exactly.
+
+The position doubles as the SSE event id. A reconnecting EventSource sends
+it back as Last-Event-ID, and the bars that changed since are recomputed
+from it, on any worker, with no per-client state kept on the server.
+
+One producer task per (asset, symbol, timeframe) notices each new minute,
+encodes the changed bars once and hands the bytes to every viewer's bounded
+queue. A viewer whose queue is full is dropped instead of conflated: a
+skipped update would leave a wrong bar on its chart, while a dropped
+EventSource reconnects and catches up from its Last-Event-ID.
+"""
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from quantdata.ohlc import OHLCBars, to_records
+from quantdata.resample import open_series
+from quantdata.ticks import Subscriber
+
+MINUTE = 60
+CHECK_INTERVAL = float(os.environ.get("QDA_FEED_INTERVAL", 1.0))
+QUEUE_SIZE = int(os.environ.get("QDA_FEED_QUEUE", 64))
+# Seconds of silence before a comment line keeps proxies from closing the stream.
+KEEPALIVE = float(os.environ.get("QDA_FEED_KEEPALIVE", 15.0))
+RETRY_MS = 2000
+# Largest initial window a live stream may ask for.
+MAX_LIVE_BARS = int(os.environ.get("QDA_FEED_MAX_BARS", 5000))
+
+
+def position(now):
+    """Epoch minute of the latest 1-minute bar closed by now."""
+    return int(now) // MINUTE - 1
+
+
+def bar_index(series, minute):
+    """Index in series of the bar containing the given epoch minute."""
+    return minute * MINUTE // series.step
+
+
+def first_bar(series, minute, count):
+    """Index of the first of the latest count bars up to minute, never before the epoch."""
+    return max(0, bar_index(series, minute) - count + 1)
+
+
+def bars_through(series, first, minute):
+    """Bars first .. the one containing minute, the last cut off after that minute."""
+    last = bar_index(series, minute)
+    bars = series.window(first, last - first + 1)
+    ratio = series.step // MINUTE
+    closed = minute - last * ratio + 1
+    if not len(bars.time) or closed >= ratio:
+        return bars
+    minutes = open_series(series.asset, series.symbol, "1min").window(last * ratio, closed)
+    partial = (
+        minutes.time[0],
+        minutes.open[0],
+        minutes.high.max(),
+        minutes.low.min(),
+        minutes.close[-1],
+        minutes.volume.sum(),
+    )
+    return OHLCBars(*(np.append(column[:-1], value) for column, value in zip(bars, partial)))
+
+
+def sse_event(event, data, event_id=None):
+    """One SSE message; data is encoded as compact JSON on a single line."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def parse_event_id(value):
+    """A Last-Event-ID sent back by a client, or None if it is missing or not ours."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+class BarFeed:
+    """Viewers per series with one producer task per series being watched."""
+
+    def __init__(self, clock=time.time, interval=CHECK_INTERVAL, queue_size=QUEUE_SIZE):
+        self.clock = clock
+        self.interval = interval
+        self.queue_size = queue_size
+        self._viewers = {}
+        self._producers = {}
+        self.stats = {"updates": 0, "delivered": 0, "dropped": 0}
+
+    def position(self):
+        return position(self.clock())
+
+    def subscribe(self, series):
+        """Registers a new viewer of series; its queue receives (position, message) pairs."""
+        key = (series.asset, series.symbol, series.timeframe)
+        viewer = Subscriber(self.queue_size)
+        self._viewers.setdefault(key, set()).add(viewer)
+        if key not in self._producers:
+            self._producers[key] = asyncio.get_running_loop().create_task(self._produce(series, self.position()))
+        return viewer
+
+    def unsubscribe(self, series, viewer):
+        key = (series.asset, series.symbol, series.timeframe)
+        viewers = self._viewers.get(key)
+        if viewers is None:
+            return
+        viewers.discard(viewer)
+        if not viewers:
+            del self._viewers[key]
+            self._producers.pop(key).cancel()
+
+    def close(self):
+        """Stops every producer and ends every open stream."""
+        for task in self._producers.values():
+            task.cancel()
+        for viewers in self._viewers.values():
+            for viewer in viewers:
+                viewer.evict()
+        self._producers.clear()
+        self._viewers.clear()
+
+    def broadcast(self, key, item):
+        for viewer in list(self._viewers.get(key, ())):
+            try:
+                viewer.queue.put_nowait(item)
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                self._viewers[key].discard(viewer)
+                viewer.evict()
+
+    async def _produce(self, series, sent):
+        key = (series.asset, series.symbol, series.timeframe)
+        while True:
+            await asyncio.sleep(self.interval)
+            now = self.position()
+            if now <= sent:
+                continue
+            bars = bars_through(series, bar_index(series, sent + 1), now)
+            self.broadcast(key, (now, sse_event("bars", to_records(bars), now)))
+            self.stats["updates"] += 1
+            sent = now
+
+    def snapshot(self):
+        return dict(self.stats, series=len(self._producers), viewers=sum(len(v) for v in self._viewers.values()))
+
+
+def opening(series, count, metadata, last_event_id, now):
+    """First message of a stream: the bars changed since last_event_id if it is recent, else the latest count bars.
+
+    None when the client is already up to date.
+    """
+    newest = bar_index(series, now)
+    if last_event_id is not None and 0 <= last_event_id and newest - bar_index(series, last_event_id + 1) < count:
+        if last_event_id >= now:
+            return None
+        bars = bars_through(series, bar_index(series, last_event_id + 1), now)
+        return sse_event("bars", to_records(bars), now)
+    bars = bars_through(series, first_bar(series, now, count), now)
+    return sse_event("snapshot", {"metadata": dict(metadata, count=len(bars.time)), "data": to_records(bars)}, now)
+
+
+async def stream(feed, series, count, metadata, last_event_id=None):
+    """The SSE body for one viewer: the initial window (or a catch-up from last_event_id), then updates."""
+    viewer = feed.subscribe(series)
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        now = feed.position()
+        # Rolling up the window can take a while; keep it off the event loop
+        message = await run_in_threadpool(opening, series, count, metadata, last_event_id, now)
+        if message is not None:
+            yield message
+        sent = now
+
+        while True:
+            try:
+                item = await asyncio.wait_for(viewer.queue.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if item is None:
+                return  # dropped for falling behind; the client resumes from its last id
+            event_position, message = item
+            if event_position > sent:
+                sent = event_position
+                yield message
+    finally:
+        feed.unsubscribe(series, viewer)
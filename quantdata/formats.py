@@ -0,0 +1,177 @@
+"""Response formats for OHLC data and Accept-header negotiation."""
+import json
+import struct
+
+import numpy as np
+
+from quantdata.ohlc import COLUMNS
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # Arrow output is optional
+    pyarrow = None
+
+# Formats that are written out chunk by chunk instead of as one document.
+STREAMING_FORMATS = ("ndjson", "csv")
+# Formats encoded straight from the column arrays.
+BINARY_FORMATS = ("columnar", "arrow")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "columnar": "application/vnd.quantdata.columnar",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+_ACCEPT_ALIASES = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonlines": "ndjson",
+    "text/csv": "csv",
+    "application/vnd.quantdata.columnar": "columnar",
+    "application/octet-stream": "columnar",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+
+def negotiate(fmt, accept):
+    """Picks an output format: explicit ?format= wins, then the Accept header, then JSON.
+
+    Returns None when an explicit format is unknown or unavailable.
+    """
+    if fmt:
+        fmt = fmt.lower()
+        return fmt if fmt in MEDIA_TYPES and _available(fmt) else None
+    for part in (accept or "").split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in _ACCEPT_ALIASES and _available(_ACCEPT_ALIASES[media]):
+            return _ACCEPT_ALIASES[media]
+    return "json"
+
+
+def _available(fmt):
+    return fmt != "arrow" or pyarrow is not None
+
+
+def encode_json(content):
+    """Same bytes JSONResponse would produce, for bodies that are cached before sending."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _ndjson_line(row):
+    return '{"time":%d,"open":%r,"high":%r,"low":%r,"close":%r,"volume":%d}' % row
+
+
+def _csv_line(row):
+    return "%d,%r,%r,%r,%r,%d" % row
+
+
+def _rows(bars):
+    return zip(*(getattr(bars, c).tolist() for c in COLUMNS))
+
+
+def iter_ndjson(chunks, metadata):
+    """One metadata header line, then one JSON object per bar."""
+    yield json.dumps({"status": "success", "metadata": metadata}) + "\n"
+    for bars in chunks:
+        if len(bars):
+            yield "\n".join(map(_ndjson_line, _rows(bars))) + "\n"
+
+
+def iter_csv(chunks, metadata):
+    """A '#'-prefixed metadata comment line, the column header, then one row per bar."""
+    yield "# " + json.dumps(metadata) + "\n"
+    yield ",".join(COLUMNS) + "\n"
+    for bars in chunks:
+        if len(bars):
+            yield "\n".join(map(_csv_line, _rows(bars))) + "\n"
+
+
+STREAM_ENCODERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
+
+
+# Packed columnar layout ("QDAC"), all little-endian and 8-byte aligned:
+#
+#   magic     4s   b"QDAC"
+#   version   u16
+#   columns   u16
+#   rows      u64
+#   meta_len  u32  length of the UTF-8 JSON metadata that follows the descriptors
+#   reserved  u32
+#   columns x (name 8s, dtype 8s e.g. b"<f8", offset u64 from start of payload)
+#   metadata JSON, zero-padded to 8 bytes
+#   column data, rows * 8 bytes each
+#
+# A client reads a column with np.frombuffer(buf, dtype, rows, offset).
+COLUMNAR_MAGIC = b"QDAC"
+COLUMNAR_VERSION = 1
+_HEADER = struct.Struct("<4sHHQII")
+_DESCRIPTOR = struct.Struct("<8s8sQ")
+COLUMN_DTYPES = {
+    "time": "<i8",
+    "open": "<f8",
+    "high": "<f8",
+    "low": "<f8",
+    "close": "<f8",
+    "volume": "<i8",
+}
+
+
+def encode_columnar(bars, metadata, extra=None):
+    """Packs bars, plus any extra float columns, into the QDAC layout described above."""
+    rows = len(bars)
+    columns = [(name, getattr(bars, name), COLUMN_DTYPES[name]) for name in COLUMNS]
+    columns += [(name, values, "<f8") for name, values in (extra or {}).items()]
+    meta = json.dumps(metadata).encode()
+    meta += b"\0" * (-len(meta) % 8)
+    offset = _HEADER.size + _DESCRIPTOR.size * len(columns) + len(meta)
+
+    descriptors = []
+    arrays = []
+    for name, values, dtype in columns:
+        arrays.append(np.ascontiguousarray(values, dtype=dtype))
+        descriptors.append(_DESCRIPTOR.pack(name.encode(), dtype.encode(), offset))
+        offset += rows * 8
+
+    header = _HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(columns), rows, len(meta), 0)
+    return b"".join([header, *descriptors, meta, *(a.data for a in arrays)])
+
+
+def decode_columnar(payload):
+    """Zero-copy reader for the QDAC layout: returns (metadata, {name: array})."""
+    magic, version, ncols, rows, meta_len, _ = _HEADER.unpack_from(payload, 0)
+    if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION:
+        raise ValueError("Not a QDAC v1 payload")
+    columns = {}
+    for i in range(ncols):
+        name, dtype, offset = _DESCRIPTOR.unpack_from(payload, _HEADER.size + i * _DESCRIPTOR.size)
+        columns[name.rstrip(b"\0").decode()] = np.frombuffer(payload, dtype=dtype.rstrip(b"\0").decode(), count=rows, offset=offset)
+    meta_start = _HEADER.size + ncols * _DESCRIPTOR.size
+    metadata = json.loads(bytes(payload[meta_start:meta_start + meta_len]).rstrip(b"\0"))
+    return metadata, columns
+
+
+def encode_arrow(bars, metadata, extra=None):
+    """Arrow IPC stream with one record batch; metadata rides in the schema."""
+    if pyarrow is None:
+        raise ValueError("Arrow output requires pyarrow on the server")
+    columns = {name: getattr(bars, name) for name in COLUMNS}
+    columns.update(extra or {})
+    table = pyarrow.table(columns)
+    table = table.replace_schema_metadata({"metadata": json.dumps(metadata)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+BINARY_ENCODERS = {
+    "columnar": encode_columnar,
+    "arrow": encode_arrow,
+}
@@ -0,0 +1,319 @@
+"""Vectorized technical indicators over OHLC columns.
+
+Indicators are requested as a comma-separated spec, e.g.
+"sma:20,ema:12,rsi:14,vwap,atr:14,bb:20:2", and come back as extra float
+columns named sma20, ema12, rsi14, vwap, atr14 and bbu20 / bbm20 / bbl20
+(short enough for QDAC column names).
+
+Every indicator is a function of (bars, state) -> (columns, state). The state
+is what the indicator needs to carry on with the next bar: the last period - 1
+closes for the moving windows, the last smoothed values for the recursive
+ones and the running session totals for VWAP. Feeding the state from one
+window into the next appended window gives the values a single pass over
+both would (to rounding), so appending bars costs time proportional to the
+new bars rather than to the whole history.
+
+Recursive averages (EMA, and Wilder's smoothing for RSI and ATR) are computed
+in blocks: inside a block the recurrence is a scaled cumulative sum, so a
+window never loops over bars in Python.
+"""
+import base64
+import json
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from quantdata.ohlc import OHLCBars
+
+STATE_VERSION = 1
+MAX_INDICATORS = 16
+MAX_PERIOD = 1000
+DECIMALS = 4
+# Windows per running-sum restart in the moving-window indicators.
+ROLLING_BLOCK = 1024
+
+# Defaults per kind: (period, band width). Band width only applies to Bollinger.
+DEFAULTS = {
+    "sma": (20, 0.0),
+    "ema": (20, 0.0),
+    "rsi": (14, 0.0),
+    "vwap": (0, 0.0),
+    "atr": (14, 0.0),
+    "bb": (20, 2.0),
+}
+
+
+class Indicator(NamedTuple):
+    kind: str
+    period: int
+    width: float
+
+    @property
+    def columns(self):
+        if self.kind == "vwap":
+            return ("vwap",)
+        if self.kind == "bb":
+            return tuple(f"bb{band}{self.period}" for band in "uml")
+        return (f"{self.kind}{self.period}",)
+
+    @property
+    def key(self):
+        """Identifies the indicator in a state token."""
+        return f"{self.kind}:{self.period}:{self.width:g}"
+
+    def warmup(self, step, start_time):
+        """Bars needed before a window for its first value to be fully formed."""
+        if self.kind in ("sma", "bb"):
+            return self.period - 1
+        if self.kind == "ema":
+            # (1 - 2 / (p + 1)) ** 5p ~ e**-10 of the seed is left.
+            return 5 * self.period
+        if self.kind in ("rsi", "atr"):
+            # Wilder smoothing decays slower: (1 - 1 / p) ** 10p ~ e**-10.
+            return 10 * self.period
+        # VWAP restarts each UTC day, so it only needs the day so far.
+        return (start_time % 86400) // step
+
+
+def parse_indicators(spec):
+    """Indicators from a spec string; raises ValueError on anything malformed."""
+    indicators = []
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        kind, *args = part.strip().lower().split(":")
+        if kind not in DEFAULTS:
+            raise ValueError(f"Unknown indicator: {kind}")
+        period, width = DEFAULTS[kind]
+        try:
+            if kind == "vwap" and args:
+                raise ValueError
+            if args:
+                period = int(args[0])
+            if kind == "bb" and len(args) > 1:
+                width = float(args[1])
+            if len(args) > (2 if kind == "bb" else 1):
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"Malformed indicator: {part.strip()}")
+        if kind != "vwap" and not 1 <= period <= MAX_PERIOD:
+            raise ValueError(f"Indicator period must be between 1 and {MAX_PERIOD}")
+        if kind == "bb" and not 0 < width <= 10:
+            raise ValueError("Bollinger width must be between 0 and 10")
+        indicators.append(Indicator(kind, period, width))
+
+    if len(indicators) > MAX_INDICATORS:
+        raise ValueError(f"At most {MAX_INDICATORS} indicators per request")
+    names = [name for ind in indicators for name in ind.columns]
+    if len(names) != len(set(names)):
+        raise ValueError("Duplicate indicator")
+    return tuple(indicators)
+
+
+def _ema(x, alpha, prev=None):
+    """y[t] = (1 - alpha) * y[t - 1] + alpha * x[t], starting from prev (default x[0])."""
+    out = np.empty(len(x))
+    if not len(x):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+    prev = float(x[0]) if prev is None else prev
+    # Within a block, decay ** -k must stay well inside float range.
+    block = int(max(1, min(4096, 500 / -np.log(decay))))
+    scale = decay ** -np.arange(1, block + 1, dtype=np.float64)
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        s = scale[:len(chunk)]
+        out[start:start + len(chunk)] = (prev + alpha * np.cumsum(chunk * s)) / s
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def _rolling(x, tail, period):
+    """(x with the carried tail in front, new tail to carry)."""
+    full = np.concatenate((np.asarray(tail, dtype=np.float64), x))
+    new_tail = full[len(full) - (period - 1):] if period > 1 else full[:0]
+    return full, new_tail
+
+
+def _window_stats(full, period, keep):
+    """Mean and population std of the period-bar window ending at each of the last keep values.
+
+    Uses running sums, restarted every ROLLING_BLOCK windows around a local
+    reference so rounding error does not build up over long series.
+    """
+    mean = np.full(keep, np.nan)
+    std = np.full(keep, np.nan)
+    n = len(full)
+    first = max(period - 1, n - keep)
+    for end in range(first, n, ROLLING_BLOCK):
+        stop = min(n, end + ROLLING_BLOCK)
+        chunk = full[end - period + 1:stop]
+        centred = chunk - chunk[0]
+        s1 = np.concatenate(([0.0], np.cumsum(centred)))
+        s2 = np.concatenate(([0.0], np.cumsum(centred * centred)))
+        m = (s1[period:] - s1[:-period]) / period
+        var = (s2[period:] - s2[:-period]) / period - m * m
+        out = slice(end - (n - keep), stop - (n - keep))
+        mean[out] = m + chunk[0]
+        # A one-bar window has no spread; its running-sum variance would only be rounding noise.
+        std[out] = 0.0 if period == 1 else np.sqrt(np.maximum(var, 0.0))
+    return mean, std
+
+
+def _sma(ind, bars, state):
+    full, tail = _rolling(bars.close, state.get("tail", []), ind.period)
+    mean, _ = _window_stats(full, ind.period, len(bars))
+    return (mean,), {"tail": tail.tolist()}
+
+
+def _bb(ind, bars, state):
+    full, tail = _rolling(bars.close, state.get("tail", []), ind.period)
+    mean, std = _window_stats(full, ind.period, len(bars))
+    band = ind.width * std
+    return (mean + band, mean, mean - band), {"tail": tail.tolist()}
+
+
+def _ema_indicator(ind, bars, state):
+    ema = _ema(bars.close, 2.0 / (ind.period + 1), state.get("ema"))
+    return (ema,), {"ema": float(ema[-1])}
+
+
+def _rsi(ind, bars, state):
+    close = bars.close
+    delta = np.diff(close, prepend=state.get("prev", close[0]))
+    alpha = 1.0 / ind.period
+    gain = _ema(np.maximum(delta, 0.0), alpha, state.get("gain"))
+    loss = _ema(np.maximum(-delta, 0.0), alpha, state.get("loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+    return (rsi,), {"prev": float(close[-1]), "gain": float(gain[-1]), "loss": float(loss[-1])}
+
+
+def _atr(ind, bars, state):
+    prev_close = np.concatenate(([state.get("prev", bars.close[0])], bars.close[:-1]))
+    true_range = np.maximum(bars.high - bars.low, np.maximum(np.abs(bars.high - prev_close), np.abs(bars.low - prev_close)))
+    atr = _ema(true_range, 1.0 / ind.period, state.get("atr"))
+    return (atr,), {"prev": float(bars.close[-1]), "atr": float(atr[-1])}
+
+
+def _vwap(ind, bars, state):
+    typical = (bars.high + bars.low + bars.close) / 3.0
+    volume = bars.volume.astype(np.float64)
+    day = bars.time // 86400
+    new_day = np.empty(len(day), dtype=bool)
+    new_day[0] = True
+    new_day[1:] = day[1:] != day[:-1]
+
+    # Running totals restart at each session; the first session may continue the state.
+    pv, v = np.cumsum(typical * volume), np.cumsum(volume)
+    starts = np.flatnonzero(new_day)
+    session = np.cumsum(new_day) - 1
+    pv -= (pv[starts] - typical[starts] * volume[starts])[session]
+    v -= (v[starts] - volume[starts])[session]
+    if state.get("day") == int(day[0]):
+        first = session == 0
+        pv[first] += state["pv"]
+        v[first] += state["v"]
+    return (pv / v,), {"day": int(day[-1]), "pv": float(pv[-1]), "v": float(v[-1])}
+
+
+_COMPUTE = {
+    "sma": _sma,
+    "ema": _ema_indicator,
+    "rsi": _rsi,
+    "vwap": _vwap,
+    "atr": _atr,
+    "bb": _bb,
+}
+
+
+# Fields each kind carries in its state: "tail" is a list of closes, the rest are numbers.
+_STATE_FIELDS = {
+    "sma": {"tail"},
+    "ema": {"ema"},
+    "rsi": {"prev", "gain", "loss"},
+    "vwap": {"day", "pv", "v"},
+    "atr": {"prev", "atr"},
+    "bb": {"tail"},
+}
+
+
+def _finite(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _valid_state(ind, state):
+    """Whether state is something ind's compute function could have returned."""
+    if not isinstance(state, dict) or not set(state) <= _STATE_FIELDS[ind.kind]:
+        return False
+    tail = state.get("tail", [])
+    if not isinstance(tail, list) or len(tail) > max(0, ind.period - 1):
+        return False
+    if ind.kind == "vwap" and state and (set(state) != _STATE_FIELDS["vwap"] or not isinstance(state["day"], int)):
+        return False
+    return all(_finite(value) for value in tail + [v for name, v in state.items() if name != "tail"])
+
+
+def warmup_bars(indicators, step, start_time):
+    return max((ind.warmup(step, start_time) for ind in indicators), default=0)
+
+
+def compute(indicators, bars, states=None):
+    """({column name: float array}, new states) for bars, continuing from states if given."""
+    states = states or {}
+    columns = {}
+    new_states = {}
+    for ind in indicators:
+        if not len(bars):
+            columns.update((name, np.empty(0)) for name in ind.columns)
+            new_states[ind.key] = states.get(ind.key, {})
+            continue
+        values, new_states[ind.key] = _COMPUTE[ind.kind](ind, bars, states.get(ind.key, {}))
+        columns.update(zip(ind.columns, (np.round(v, DECIMALS) for v in values)))
+    return columns, new_states
+
+
+def indicator_window(series, first, count, indicators, states=None):
+    """(bars, indicator columns, states after the window) for bars first .. first + count - 1.
+
+    Without states the indicators are warmed up on the bars before first, so
+    the window's first values are already fully formed.
+    """
+    if states is not None:
+        bars = series.window(first, count)
+        columns, states = compute(indicators, bars, states)
+        return bars, columns, states
+    warm = min(first, warmup_bars(indicators, series.step, series.time_of(first)))
+    bars = series.window(first - warm, count + warm)
+    columns, states = compute(indicators, bars)
+    return OHLCBars(*(c[warm:] for c in bars)), {name: c[warm:] for name, c in columns.items()}, states
+
+
+def encode_state(series, next_index, states):
+    """Opaque token carrying indicator state to the window starting at next_index."""
+    payload = {"v": STATE_VERSION, "k": format(series.seed, "016x"), "t": series.time_of(next_index), "s": states}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_state(token, series, first, indicators):
+    """States for indicators from a token, raising ValueError unless it continues at bar first."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        version, key, start, states = payload["v"], payload["k"], int(payload["t"]), dict(payload["s"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid indicator_state")
+    if version != STATE_VERSION or key != format(series.seed, "016x"):
+        raise ValueError("indicator_state does not belong to this asset/symbol/timeframe")
+    if start != series.time_of(first):
+        raise ValueError("indicator_state does not continue from the start of this window")
+    if any(ind.key not in states for ind in indicators):
+        raise ValueError("indicator_state does not cover the requested indicators")
+    if not all(_valid_state(ind, states[ind.key]) for ind in indicators):
+        raise ValueError("Invalid indicator_state")
+    return {ind.key: states[ind.key] for ind in indicators}
@@ -0,0 +1,67 @@
+"""Simulated network latency for the mock endpoints.
+
+Profiles are written as short specs:
+
+    none                  no delay
+    fixed:0.3             always 300ms
+    jitter:0.3:0.1        uniform in [200ms, 400ms]
+
+The deployment default comes from QDA_LATENCY; requests may override it.
+Delays are capped at MAX_LATENCY seconds (QDA_MAX_LATENCY, default 5), so
+a request cannot hold its connection open indefinitely.
+"""
+import asyncio
+import math
+import os
+import random
+from typing import NamedTuple
+
+MAX_LATENCY = float(os.environ.get("QDA_MAX_LATENCY", 5.0))
+
+
+class LatencyProfile(NamedTuple):
+    mode: str
+    seconds: float = 0.0
+    spread: float = 0.0
+
+    def sample(self):
+        """Draws one delay in seconds."""
+        if self.mode == "none":
+            return 0.0
+        if self.mode == "jitter":
+            return min(MAX_LATENCY, max(0.0, self.seconds + random.uniform(-self.spread, self.spread)))
+        return self.seconds
+
+
+def parse_latency(spec):
+    """Parses a latency spec, raising ValueError on anything malformed; delays are capped at MAX_LATENCY."""
+    parts = spec.strip().lower().split(":")
+    mode = parts[0]
+    try:
+        values = [float(p) for p in parts[1:]]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+    if not all(math.isfinite(v) for v in values):
+        raise ValueError(f"Latency must be a finite number of seconds: {spec!r}")
+    if any(v < 0 for v in values):
+        raise ValueError(f"Latency must be non-negative: {spec!r}")
+    values = [min(v, MAX_LATENCY) for v in values]
+
+    if mode == "none" and not values:
+        return LatencyProfile("none")
+    if mode == "fixed" and len(values) == 1:
+        return LatencyProfile("fixed", values[0])
+    if mode == "jitter" and len(values) == 2:
+        return LatencyProfile("jitter", values[0], values[1])
+    raise ValueError(f"Invalid latency spec: {spec!r} (expected none, fixed:<s> or jitter:<s>:<spread>)")
+
+
+DEFAULT_LATENCY = parse_latency(os.environ.get("QDA_LATENCY", "fixed:0.3"))
+
+
+async def simulate_latency(profile=DEFAULT_LATENCY):
+    """Waits for one sampled delay without blocking the event loop."""
+    delay = profile.sample()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return delay
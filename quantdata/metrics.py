@@ -0,0 +1,216 @@
+"""Request and stage timing, exposed in Prometheus text format.
+
+Latencies go into HDR-style log-linear histograms: each power of two of
+nanoseconds is split into 2**SUB_BITS linear sub-buckets, so any value is
+recorded with at most 12.5% relative error. A histogram is a preallocated
+list of counts, and recording a value is a bit_length, a shift and one list
+increment, with no objects built per call. Increments made from worker
+threads are not locked, so a scrape may occasionally miss one.
+
+MetricsMiddleware labels each HTTP request with its route template (e.g.
+/blog/{slug}, never the raw path, so cardinality stays bounded) and records
+counts by method and status, an in-flight gauge and the request duration.
+Stage histograms (generate, serialize, render, simulated_latency) are fed
+directly from the code that does the work.
+"""
+import time
+
+from starlette.routing import Match
+
+SUB_BITS = 3
+SUB = 1 << SUB_BITS
+# Buckets up to 2**40 ns (about 18 minutes); anything longer lands in the last one.
+MAGNITUDES = 40
+BUCKETS = (MAGNITUDES + 1) * SUB
+
+# Prometheus bucket bounds in seconds, summed from the HDR buckets that end at or below each.
+EXPORT_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED = "<unmatched>"
+MAX_ROUTE_CACHE = 4096
+
+
+def bucket_index(ns):
+    """HDR bucket for a duration in nanoseconds."""
+    if ns < 2 * SUB:
+        return ns if ns > 0 else 0
+    shift = ns.bit_length() - SUB_BITS - 1
+    index = ((shift + 1) << SUB_BITS) + (ns >> shift) - SUB
+    return index if index < BUCKETS else BUCKETS - 1
+
+
+def bucket_upper(index):
+    """Exclusive upper bound of a bucket, in nanoseconds."""
+    if index < 2 * SUB:
+        return index + 1
+    shift = (index >> SUB_BITS) - 1
+    return ((index & (SUB - 1)) + SUB + 1) << shift
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum_ns")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.sum_ns = 0
+
+    def record(self, ns):
+        self.counts[bucket_index(ns)] += 1
+        self.count += 1
+        self.sum_ns += ns
+
+    def cumulative(self, bounds=EXPORT_BOUNDS):
+        """[(bound seconds, observations in buckets ending at or below it)]."""
+        out = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            limit = bound * 1e9
+            while index < BUCKETS and bucket_upper(index) <= limit:
+                seen += self.counts[index]
+                index += 1
+            out.append((bound, seen))
+        return out
+
+
+class RouteStats:
+    """Counters for one route label."""
+    __slots__ = ("in_flight", "histogram", "requests")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.histogram = Histogram()
+        self.requests = {}  # method -> {status: count}
+
+    def count(self, method, status):
+        by_status = self.requests.get(method)
+        if by_status is None:
+            by_status = self.requests[method] = {}
+        by_status[status] = by_status.get(status, 0) + 1
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Route and stage metrics for one app."""
+
+    def __init__(self, routes=()):
+        self.routes = routes
+        self.by_route = {}
+        self.stages = {}
+        self._route_cache = {}
+
+    def stage(self, name):
+        """The histogram for a named stage, created on first use."""
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = self.stages[name] = Histogram()
+        return histogram
+
+    def route_stats(self, scope):
+        """RouteStats for the route scope will be dispatched to."""
+        key = scope["path"]
+        label = self._route_cache.get(key)
+        if label is None:
+            label = UNMATCHED
+            for route in self.routes:
+                match, _ = route.matches(scope)
+                if match is not Match.NONE:
+                    label = route.path
+                    break
+            if len(self._route_cache) < MAX_ROUTE_CACHE:
+                self._route_cache[key] = label
+        stats = self.by_route.get(label)
+        if stats is None:
+            stats = self.by_route[label] = RouteStats()
+        return stats
+
+    def time_iter(self, iterable, stage):
+        """Yields from iterable, recording the time spent producing each item under stage."""
+        histogram = self.stage(stage)
+        iterator = iter(iterable)
+        while True:
+            t0 = time.perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            histogram.record(time.perf_counter_ns() - t0)
+            yield item
+
+    def instrument_templates(self, templates):
+        """Times every Jinja render done through templates (TemplateResponse and PageCache alike)."""
+        histogram = self.stage("render")
+        base = templates.env.template_class
+
+        class TimedTemplate(base):
+            def render(self, *args, **kwargs):
+                t0 = time.perf_counter_ns()
+                try:
+                    return super().render(*args, **kwargs)
+                finally:
+                    histogram.record(time.perf_counter_ns() - t0)
+
+        templates.env.template_class = TimedTemplate
+
+    def render(self):
+        """All metrics in Prometheus text exposition format."""
+        lines = [
+            "# HELP qda_requests_total HTTP requests by route, method and status.",
+            "# TYPE qda_requests_total counter",
+        ]
+        routes = sorted(self.by_route.items())
+        for route, stats in routes:
+            for method, by_status in sorted(stats.requests.items()):
+                for status, n in sorted(by_status.items()):
+                    lines.append(f'qda_requests_total{{route="{_label(route)}",method="{method}",status="{status}"}} {n}')
+        lines += ["# HELP qda_requests_in_flight HTTP requests currently being served.", "# TYPE qda_requests_in_flight gauge"]
+        for route, stats in routes:
+            lines.append(f'qda_requests_in_flight{{route="{_label(route)}"}} {stats.in_flight}')
+        lines += _histogram_lines("qda_request_duration_seconds", "HTTP request duration by route.",
+                                  [(f'route="{_label(route)}"', stats.histogram) for route, stats in routes])
+        lines += _histogram_lines("qda_stage_duration_seconds", "Time spent in each stage of request handling.",
+                                  [(f'stage="{_label(name)}"', h) for name, h in sorted(self.stages.items())])
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name, help_text, series):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        for bound, n in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {n}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum_ns / 1e9:.9f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+class MetricsMiddleware:
+    """Records per-route counts, in-flight requests and durations for HTTP requests."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = self.metrics.route_stats(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats.in_flight += 1
+        t0 = time.perf_counter_ns()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            stats.histogram.record(time.perf_counter_ns() - t0)
+            stats.in_flight -= 1
+            stats.count(scope["method"], status)
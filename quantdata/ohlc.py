@@ -0,0 +1,94 @@
+"""Columnar OHLC bars: timeframes, request ranges and JSON layouts.
+
+Bars are handled as whole NumPy arrays instead of one dict at a time, so a
+single request can cover hundreds of thousands of bars. The bars themselves
+come from quantdata.series and quantdata.resample.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+import numpy as np
+
+# Upper bound on bars per request; override with QDA_MAX_BARS.
+MAX_BARS = int(os.environ.get("QDA_MAX_BARS", 1_000_000))
+
+# Bars per chunk when streaming.
+CHUNK_BARS = 5000
+
+# Last second a YYYY-MM-DD range can reach (the end of 9999-12-31 UTC).
+MAX_TIME = 253402300799
+
+# Supported bar widths in seconds. Each divides a UTC day, so every bar of
+# every timeframe nests exactly inside the bars of the coarser ones.
+TIMEFRAMES = {
+    "1min": 60,
+    "5min": 300,
+    "15min": 900,
+    "30min": 1800,
+    "1h": 3600,
+    "daily": 86400,
+}
+TIMEFRAME_ALIASES = {"60min": "1h", "1hour": "1h", "1d": "daily", "day": "daily"}
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+
+
+class OHLCBars(NamedTuple):
+    """One array per column, all the same length."""
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self):
+        return len(self.time)
+
+
+def _utc_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def parse_range(start_date, end_date):
+    """Parses YYYY-MM-DD bounds as UTC dates, falling back to the last five days."""
+    now = datetime.now(timezone.utc)
+    try:
+        start_ts = _utc_date(start_date) if start_date else now - timedelta(days=5)
+        end_ts = _utc_date(end_date) if end_date else now
+    except ValueError:
+        start_ts = now - timedelta(days=5)
+        end_ts = now
+    return start_ts, end_ts
+
+
+def normalize_timeframe(timeframe):
+    """Canonical timeframe name; anything unrecognised falls back to 5min."""
+    timeframe = (timeframe or "").strip().lower()
+    timeframe = TIMEFRAME_ALIASES.get(timeframe, timeframe)
+    return timeframe if timeframe in TIMEFRAMES else "5min"
+
+
+def timeframe_step(timeframe):
+    """Bar width in seconds for a timeframe."""
+    return TIMEFRAMES[normalize_timeframe(timeframe)]
+
+
+def _float_list(values):
+    """Float array as a list, NaN (not valid JSON) as None."""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def to_records(bars, extra=None):
+    """Row layout: the classic list of {time, open, ...} dicts, plus any extra float columns."""
+    names = COLUMNS + tuple(extra or ())
+    cols = [getattr(bars, c).tolist() for c in COLUMNS] + [_float_list(v) for v in (extra or {}).values()]
+    return [dict(zip(names, row)) for row in zip(*cols)]
+
+
+def to_columns(bars, extra=None):
+    """Column layout: {"time": [...], "open": [...], ...}, plus any extra float columns."""
+    columns = {c: getattr(bars, c).tolist() for c in COLUMNS}
+    columns.update((name, _float_list(v)) for name, v in (extra or {}).items())
+    return columns
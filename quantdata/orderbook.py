@@ -0,0 +1,392 @@
+"""Simulated level-2 order books for /api/mock/book.
+
+Each (asset, symbol) book is anchored to the same 1-minute price path the
+OHLC endpoints serve: its reference price at time t is the path interpolated
+between the opens of the minute containing t and the next. Random limit
+orders, cancels and small trades reshape the book around it, and when the
+mid falls more than DRIFT_TICKS behind the reference, aggressive orders
+walk it back, taking out levels the way a real move does.
+
+A side is two parallel array('q') columns (integer ticks and sizes), kept
+sorted so that the best price is the last element: bids by price and asks
+by negated price. Most activity happens near the touch, so an insert or
+delete moves only the few levels above it, and the best bid or ask is a
+single index. A depth-N snapshot is one memcpy of the last N entries,
+reversed as a numpy view.
+
+Books advance lazily, by as many events as the wall-clock time since the
+last advance allows (EVENTS_PER_SECOND), whether from a snapshot request or
+from the producer task that runs while anyone streams the book. Every
+advance is one delta message with the next sequence number. Its changes are
+[side, price, size] triples giving each touched level's final size, where
+size 0 removes the level. After a gap of
+more than RESET_AFTER seconds the book is rebuilt around the reference
+instead of being replayed.
+
+Event ids are "<instance>-<seq>", where instance is random per OrderBook.
+Sequence numbers only mean something to the book that issued them, and a
+reconnect may reach another worker or a book rebuilt after eviction; an id
+from any other instance gets a fresh snapshot instead of unrelated deltas.
+"""
+import asyncio
+import os
+import random
+import secrets
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from quantdata.feed import KEEPALIVE, RETRY_MS, sse_event
+from quantdata.resample import open_series
+from quantdata.series import series_seed
+from quantdata.ticks import Subscriber
+
+TICKS_PER_UNIT = 100  # a tick is one cent
+LEVELS = int(os.environ.get("QDA_BOOK_LEVELS", 1000))  # resting levels per side
+EVENTS_PER_SECOND = float(os.environ.get("QDA_BOOK_RATE", 50))
+INTERVAL = float(os.environ.get("QDA_BOOK_INTERVAL", 0.1))
+RESET_AFTER = 60.0
+DRIFT_TICKS = 2
+HISTORY = 1024  # delta messages kept for Last-Event-ID resume
+MAX_BOOKS = int(os.environ.get("QDA_BOOK_MAX", 256))
+QUEUE_SIZE = 256
+LOT = 100
+
+BID = "b"
+ASK = "a"
+
+
+class BookSide:
+    """Sorted price levels of one side; the best level is always the last one."""
+    __slots__ = ("name", "sign", "keys", "sizes")
+
+    def __init__(self, name):
+        self.name = name
+        self.sign = 1 if name == BID else -1
+        self.keys = array("q")
+        self.sizes = array("q")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def set(self, price, size):
+        """Sets the size resting at price (in ticks); 0 removes the level."""
+        key = price * self.sign
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if size:
+                self.sizes[i] = size
+            else:
+                del keys[i]
+                del self.sizes[i]
+        elif size:
+            keys.insert(i, key)
+            self.sizes.insert(i, size)
+
+    def size_at(self, price):
+        key = price * self.sign
+        i = bisect_left(self.keys, key)
+        return self.sizes[i] if i < len(self.keys) and self.keys[i] == key else 0
+
+    def best(self):
+        """Best price in ticks, or None when the side is empty."""
+        return self.keys[-1] * self.sign if self.keys else None
+
+    def level(self, distance):
+        """(price, size) of the level `distance` places behind the best."""
+        i = len(self.keys) - 1 - distance
+        return self.keys[i] * self.sign, self.sizes[i]
+
+    def worst(self):
+        return self.keys[0] * self.sign
+
+    def depth(self, n):
+        """(prices in ticks, sizes) of the best n levels, best first, as numpy arrays."""
+        n = min(n, len(self.keys))
+        if not n:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        # Slicing copies just these n entries; a view of the whole array would pin it against resizing
+        keys = np.frombuffer(self.keys[-n:], dtype=np.int64)[::-1]
+        sizes = np.frombuffer(self.sizes[-n:], dtype=np.int64)[::-1]
+        return keys * self.sign, sizes
+
+
+class OrderBook:
+    """One symbol's simulated book plus its delta history."""
+
+    def __init__(self, asset, symbol, levels=LEVELS, rate=EVENTS_PER_SECOND, clock=time.time):
+        self.asset = asset
+        self.symbol = symbol
+        self.levels = levels
+        self.rate = rate
+        self.clock = clock
+        self.path = open_series(asset, symbol, "1min")
+        self.rng = random.Random(series_seed(asset, symbol, "book"))
+        self.instance = secrets.token_hex(6)
+        self.seq = 0
+        self._minute = None  # (epoch minute, path price at it, at the next)
+        self.history = deque(maxlen=HISTORY)  # (seq, encoded delta event)
+        self.updated = clock()
+        self.reset()
+
+    def reference(self, now=None):
+        """The 1-minute price path at now, in ticks."""
+        now = self.clock() if now is None else now
+        minute = int(now) // 60
+        if self._minute is None or self._minute[0] != minute:
+            # Generating path prices costs milliseconds; they change once a minute
+            self._minute = (minute, *self.path.prices(minute, 2).tolist())
+        _, this, following = self._minute
+        price = this + (following - this) * ((now % 60) / 60.0)
+        return int(round(price * TICKS_PER_UNIT))
+
+    def reset(self):
+        """Rebuilds both sides around the reference price."""
+        rng = self.rng
+        mid = self.reference()
+        half = rng.randint(1, 2)
+        self.bids = BookSide(BID)
+        self.asks = BookSide(ASK)
+        for side, sign in ((self.bids, -1), (self.asks, 1)):
+            price = mid + sign * half
+            for _ in range(self.levels):
+                side.set(price, self._lot_size())
+                price += sign * (1 + (rng.random() < 0.3))
+        self.history.clear()
+        self.seq += 1
+        self.updated = self.clock()
+
+    def event_id(self):
+        """SSE id of the latest message: this instance plus its seq."""
+        return f"{self.instance}-{self.seq}"
+
+    def _lot_size(self):
+        return LOT * int(self.rng.paretovariate(1.5) * 2)
+
+    def step(self, target, changes, trades):
+        """Applies one random event, recording the new size of every level it touched in changes."""
+        rng = self.rng
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return
+        mid2 = bid + ask
+        if mid2 < 2 * (target - DRIFT_TICKS) or mid2 > 2 * (target + DRIFT_TICKS):
+            # Walk the book toward the reference: take out the touch, then join at the new best
+            buying = mid2 < 2 * target
+            taken, joined = (self.asks, self.bids) if buying else (self.bids, self.asks)
+            price, size = taken.level(0)
+            self._set(taken, price, 0, changes)
+            trades.append([price / TICKS_PER_UNIT, size, BID if buying else ASK])
+            # One tick inside the level just taken: the new best, and never crossing the other side
+            inside = price - 1 if buying else price + 1
+            self._set(joined, inside, joined.size_at(inside) + self._lot_size(), changes)
+        else:
+            side = self.bids if rng.random() < 0.5 else self.asks
+            roll = rng.random()
+            if roll < 0.5:
+                # New limit order, usually at or near the touch, sometimes improving it
+                distance = int(rng.expovariate(0.3)) - (rng.random() < 0.1)
+                best = side.best()
+                price = best - side.sign * distance
+                if side is self.bids and price >= ask or side is self.asks and price <= bid:
+                    price = best
+                self._set(side, price, side.size_at(price) + self._lot_size(), changes)
+            elif roll < 0.85:
+                # Cancel part or all of a level near the touch
+                distance = min(len(side) - 1, int(rng.expovariate(0.2)))
+                price, size = side.level(distance)
+                left = size - LOT * rng.randint(1, max(1, size // LOT))
+                self._set(side, price, max(0, left), changes)
+            else:
+                # Marketable order against the touch
+                price, size = side.level(0)
+                filled = min(size, LOT * rng.randint(1, 5))
+                self._set(side, price, size - filled, changes)
+                trades.append([price / TICKS_PER_UNIT, filled, ASK if side is self.bids else BID])
+        for side in (self.bids, self.asks):
+            while len(side) > self.levels:
+                self._set(side, side.worst(), 0, changes)
+            if len(side) < self.levels:
+                self._set(side, side.worst() - side.sign * (1 + (rng.random() < 0.3)), self._lot_size(), changes)
+
+    def _set(self, side, price, size, changes):
+        side.set(price, size)
+        changes[side.name, price] = size
+
+    def advance(self, now=None):
+        """Runs the events due since the last advance; returns (kind, payload) or None if nothing is due."""
+        now = self.clock() if now is None else now
+        elapsed = now - self.updated
+        if elapsed > RESET_AFTER:
+            self.reset()
+            return "snapshot", self.snapshot()
+        events = int(elapsed * self.rate)
+        if events < 1:
+            return None
+        self.updated += events / self.rate
+        # Keyed by (side, price), so a level touched several times is sent once with its final size
+        changes, trades = {}, []
+        target = self.reference(now)
+        for _ in range(events):
+            self.step(target, changes, trades)
+        self.seq += 1
+        delta = {
+            "seq": self.seq,
+            "time": now,
+            "changes": [[side, price / TICKS_PER_UNIT, size] for (side, price), size in changes.items()],
+            "trades": trades,
+        }
+        self.history.append((self.seq, sse_event("delta", delta, self.event_id())))
+        return "delta", delta
+
+    def since(self, event_id):
+        """Encoded delta events after event_id, or None if it is not from this book or too old."""
+        instance, _, seq = event_id.partition("-")
+        if instance != self.instance or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq == self.seq:
+            return []
+        if not self.history or self.history[0][0] > seq + 1 or seq > self.seq:
+            return None
+        return [message for s, message in self.history if s > seq]
+
+    def snapshot(self, depth=None):
+        depth = self.levels if depth is None else depth
+        bid_prices, bid_sizes = self.bids.depth(depth)
+        ask_prices, ask_sizes = self.asks.depth(depth)
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        return {
+            "symbol": self.symbol,
+            "asset": self.asset,
+            "seq": self.seq,
+            "time": self.updated,
+            "mid": (best_bid + best_ask) / (2 * TICKS_PER_UNIT),
+            "spread": (best_ask - best_bid) / TICKS_PER_UNIT,
+            "bids": [list(level) for level in zip((bid_prices / TICKS_PER_UNIT).tolist(), bid_sizes.tolist())],
+            "asks": [list(level) for level in zip((ask_prices / TICKS_PER_UNIT).tolist(), ask_sizes.tolist())],
+        }
+
+
+class BookHub:
+    """Books by (asset, symbol), with one producer task per book being streamed."""
+
+    def __init__(self, max_books=MAX_BOOKS, interval=INTERVAL):
+        self.max_books = max_books
+        self.interval = interval
+        self._books = OrderedDict()
+        self._viewers = {}
+        self._producers = {}
+        self.stats = {"deltas": 0, "delivered": 0, "dropped": 0, "resets": 0}
+
+    def book(self, asset, symbol):
+        key = (asset, symbol)
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = OrderBook(asset, symbol)
+            # Forget the least recently used books nobody is streaming
+            for old in list(self._books):
+                if len(self._books) <= self.max_books:
+                    break
+                if old not in self._viewers:
+                    del self._books[old]
+        self._books.move_to_end(key)
+        return book
+
+    def advance(self, book):
+        """Brings book up to date and sends whatever changed to its viewers."""
+        result = book.advance()
+        if result is None:
+            return
+        kind, payload = result
+        key = (book.asset, book.symbol)
+        if kind == "snapshot":
+            self.stats["resets"] += 1
+            message = sse_event("snapshot", payload, book.event_id())
+        else:
+            self.stats["deltas"] += 1
+            message = book.history[-1][1]
+        for viewer in list(self._viewers.get(key, ())):
+            try:
+                viewer.queue.put_nowait((book.seq, message))
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                self._viewers[key].discard(viewer)
+                viewer.evict()
+
+    def subscribe(self, book):
+        key = (book.asset, book.symbol)
+        viewer = Subscriber(QUEUE_SIZE)
+        self._viewers.setdefault(key, set()).add(viewer)
+        if key not in self._producers:
+            self._producers[key] = asyncio.get_running_loop().create_task(self._produce(book))
+        return viewer
+
+    def unsubscribe(self, book, viewer):
+        key = (book.asset, book.symbol)
+        viewers = self._viewers.get(key)
+        if viewers is None:
+            return
+        viewers.discard(viewer)
+        if not viewers:
+            del self._viewers[key]
+            self._producers.pop(key).cancel()
+
+    def close(self):
+        """Stops every producer and ends every open stream."""
+        for task in self._producers.values():
+            task.cancel()
+        for viewers in self._viewers.values():
+            for viewer in viewers:
+                viewer.evict()
+        self._producers.clear()
+        self._viewers.clear()
+
+    async def _produce(self, book):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.advance(book)
+
+    def snapshot(self):
+        return dict(self.stats, books=len(self._books), streamed=len(self._producers),
+                    viewers=sum(len(v) for v in self._viewers.values()))
+
+
+async def stream(hub, book, last_event_id=None):
+    """SSE body: a snapshot (or the deltas missed since last_event_id), then every delta as it happens.
+
+    The snapshot is the whole book. Deltas touch levels at any depth, and a
+    level removed near the touch brings a deeper one into view, so they only
+    apply cleanly to a client that holds every level.
+    """
+    viewer = hub.subscribe(book)
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        hub.advance(book)
+        missed = book.since(last_event_id) if last_event_id else None
+        if missed is None:
+            yield sse_event("snapshot", book.snapshot(), book.event_id())
+        else:
+            for message in missed:
+                yield message
+        sent = book.seq
+
+        while True:
+            try:
+                item = await asyncio.wait_for(viewer.queue.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if item is None:
+                return  # dropped for falling behind; the client resumes from its last id
+            seq, message = item
+            if seq > sent:
+                sent = seq
+                yield message
+    finally:
+        hub.unsubscribe(book, viewer)
@@ -0,0 +1,148 @@
+"""Pre-rendered, precompressed pages for templates whose context never changes.
+
+Each (template, context) pair is rendered once into bytes and stored with
+gzip and deflate variants, then served with ETag / Last-Modified / Vary so
+repeat hits cost a dict lookup instead of a Jinja render. The cache is
+dropped whenever any file under the template directory changes, which also
+covers edits to base layouts and partials.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+import zlib
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import NamedTuple
+
+from starlette.responses import Response
+
+from quantdata.cache import etag_matches
+
+# Re-check template mtimes at most this often (seconds).
+CHECK_INTERVAL = float(os.environ.get("QDA_TEMPLATE_CHECK_INTERVAL", 1.0))
+MAX_PAGES = 512
+
+
+class RenderedPage(NamedTuple):
+    bodies: dict  # content-coding -> bytes
+    etag: str  # identity ETag, without quotes
+    last_modified: str
+    mtime: int
+
+
+def pick_encoding(accept_encoding):
+    """gzip, deflate or identity, from an Accept-Encoding header."""
+    accepted = {}
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip()] = q
+    for coding in ("gzip", "deflate"):
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+class PageCache:
+    def __init__(self, templates, directory, max_pages=MAX_PAGES, check_interval=CHECK_INTERVAL):
+        self.templates = templates
+        self.directory = directory
+        self.max_pages = max_pages
+        self.check_interval = check_interval
+        self._pages = OrderedDict()
+        self._mtime = self._scan()
+        self._checked = time.monotonic()
+        self.stats = {"hits": 0, "renders": 0, "invalidations": 0}
+
+    def _scan(self):
+        """Newest mtime under the template directory."""
+        newest = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                newest = max(newest, int(os.stat(os.path.join(root, name)).st_mtime))
+        return newest
+
+    def _check_templates(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        mtime = self._scan()
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._pages.clear()
+            self.stats["invalidations"] += 1
+
+    def get(self, template, context, key=None):
+        """The rendered page for (template, context), rendering it on first use.
+
+        key defaults to the serialized context; pass one explicitly when the
+        context is large but identified by something cheaper.
+        """
+        self._check_templates()
+        key = (template, key if key is not None else json.dumps(context, sort_keys=True, default=str))
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+            self.stats["hits"] += 1
+            return page
+
+        body = self.templates.get_template(template).render(context).encode("utf-8")
+        page = RenderedPage(
+            bodies={
+                "identity": body,
+                "gzip": gzip.compress(body, 9, mtime=0),
+                "deflate": zlib.compress(body, 9),
+            },
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            last_modified=formatdate(self._mtime, usegmt=True),
+            mtime=self._mtime,
+        )
+        self._pages[key] = page
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        self.stats["renders"] += 1
+        return page
+
+    def response(self, request, template, context, status_code=200, key=None):
+        """Serves a cached page, honouring Accept-Encoding and conditional headers."""
+        page = self.get(template, context, key)
+        coding = pick_encoding(request.headers.get("accept-encoding"))
+        etag = f'"{page.etag}"' if coding == "identity" else f'"{page.etag}-{coding}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": page.last_modified,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "public, max-age=0, must-revalidate",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            not_modified = etag_matches(if_none_match, etag)
+        else:
+            not_modified = _not_modified_since(request.headers.get("if-modified-since"), page.mtime)
+        if not_modified and status_code == 200:
+            return Response(status_code=304, headers=headers)
+
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(page.bodies[coding], status_code=status_code, media_type="text/html", headers=headers)
+
+    def snapshot(self):
+        return dict(self.stats, pages=len(self._pages))
+
+
+def _not_modified_since(header, mtime):
+    if not header:
+        return False
+    try:
+        return mtime <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
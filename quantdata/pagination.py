@@ -0,0 +1,42 @@
+"""Opaque keyset cursors for paging through a series.
+
+A cursor records where the next page starts, where the requested range ends
+and which series it belongs to. Series are seekable, so resuming from a
+cursor costs the same at any depth.
+"""
+import base64
+import json
+
+from quantdata.ohlc import MAX_TIME
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(series, next_index, last_index):
+    """Cursor for bars next_index .. last_index of series."""
+    payload = {
+        "v": CURSOR_VERSION,
+        "k": format(series.seed, "016x"),
+        "t": series.time_of(next_index),
+        "e": series.time_of(last_index),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor, series):
+    """Returns (next_index, last_index), raising ValueError if the cursor is bad or foreign."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        version, key, next_time, end_time = payload["v"], payload["k"], int(payload["t"]), int(payload["e"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if version != CURSOR_VERSION:
+        raise ValueError("Unsupported cursor version")
+    if key != format(series.seed, "016x"):
+        raise ValueError("Cursor does not belong to this asset/symbol/timeframe")
+    # Only a page boundary inside a range parse_range could have produced is accepted
+    if not 0 <= next_time <= end_time <= MAX_TIME or next_time % series.step or end_time % series.step:
+        raise ValueError("Invalid cursor")
+    return next_time // series.step, end_time // series.step
@@ -0,0 +1,178 @@
+"""On-demand stack-sampling profiler.
+
+While a session runs, a daemon thread wakes every `interval` seconds, reads
+every other thread's stack with sys._current_frames() and counts it as one
+collapsed stack ("thread;outer (file:line);...;leaf (file:line)"), the
+input format of flamegraph.pl, speedscope and friends. Threads that are
+idle, blocked in select() or waiting for work, are skipped.
+
+A session either runs for a fixed number of seconds or until the next N
+requests whose path starts with a prefix have completed. In request mode
+stacks are only sampled while at least one matching request is in flight.
+With no session running there is no thread and the middleware does nothing
+but one attribute check per request.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+INTERVAL = float(os.environ.get("QDA_PROFILE_INTERVAL", 0.005))
+MAX_SECONDS = 300
+
+# (file name, function) leaves that mean a thread is waiting, not working.
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("_base.py", "wait"),
+}
+
+
+class ProfileSession:
+    """One profiling run; samples land in `stacks`."""
+
+    def __init__(self, seconds=None, route=None, requests=None, interval=INTERVAL):
+        self.seconds = seconds
+        self.route = route
+        self.requests = requests
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.matched = 0
+        self.active = 0  # matching requests in flight
+        self.started = time.monotonic()
+        self.finished = None
+        self.done = threading.Event()
+        self._labels = {}
+        self._thread = threading.Thread(target=self._run, name="qda-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.done.set()
+        self._thread.join()
+        if self.finished is None:
+            self.finished = time.monotonic()
+
+    def matches(self, path):
+        return self.route is not None and path.startswith(self.route)
+
+    def request_started(self):
+        self.active += 1
+
+    def request_finished(self):
+        self.active -= 1
+        self.matched += 1
+        if self.requests is not None and self.matched >= self.requests:
+            self.finished = time.monotonic()
+            self.done.set()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        deadline = None if self.seconds is None else self.started + self.seconds
+        while not self.done.wait(self.interval):
+            if deadline is not None and time.monotonic() >= deadline:
+                self.finished = time.monotonic()
+                self.done.set()
+                break
+            if self.route is not None and not self.active:
+                continue
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Collapsed stacks, one "frames count" line each, heaviest first."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def top(self, n=25):
+        """Functions by self samples, with inclusive samples alongside."""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        samples = max(1, self.samples)
+        return [
+            {
+                "function": function,
+                "self": count,
+                "total": total[function],
+                "self_pct": round(100.0 * count / samples, 2),
+                "total_pct": round(100.0 * total[function] / samples, 2),
+            }
+            for function, count in own.most_common(n)
+        ]
+
+    def summary(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return {
+            "seconds": round(end - self.started, 3),
+            "interval": self.interval,
+            "samples": self.samples,
+            "requests": self.matched,
+            "route": self.route,
+        }
+
+
+class Profiler:
+    """Holds the one session allowed at a time."""
+
+    def __init__(self):
+        self.session = None
+
+    def start(self, **kwargs):
+        if self.session is not None:
+            raise RuntimeError("A profiling session is already running")
+        self.session = ProfileSession(**kwargs).start()
+        return self.session
+
+    def finish(self):
+        session, self.session = self.session, None
+        if session is not None:
+            session.stop()
+        return session
+
+
+class ProfilerMiddleware:
+    """Tells a request-mode session when matching requests start and finish."""
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        session = self.profiler.session
+        if session is None or scope["type"] != "http" or not session.matches(scope["path"]):
+            return await self.app(scope, receive, send)
+        session.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.request_finished()
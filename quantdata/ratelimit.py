@@ -0,0 +1,222 @@
+"""Per-key and per-IP token buckets, applied as ASGI middleware.
+
+Requests under the limited path prefixes are charged one token. A request
+carrying a configured API key (Authorization: Bearer, X-API-Key or ?apikey=)
+is charged against that key's tier as documented on /docs/limits: a
+requests-per-minute bucket plus a daily allowance. Everything else, unknown
+keys included (so rotating keys cannot dodge the limit), shares one bucket
+per client address.
+
+A bucket is two floats refilled lazily from the elapsed time, so checking
+one is O(1). Buckets live in SHARDS dicts picked by key hash, each with its
+own lock, so threads never contend on one global lock. A sweeper task walks
+one shard per tick and drops buckets that have refilled completely, since
+a full bucket is the same as no bucket, so idle clients do not leak memory.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import parse_qs
+
+ENABLED = os.environ.get("QDA_RATE_LIMIT", "on").lower() not in ("0", "off", "false", "no")
+SHARDS = 16
+# Seconds between sweeps of consecutive shards.
+SWEEP_INTERVAL = float(os.environ.get("QDA_RATE_SWEEP", 5.0))
+
+
+class Tier(NamedTuple):
+    per_minute: int
+    per_day: int
+
+
+# As documented in templates/docs/limits.html.
+TIERS = {
+    "free": Tier(5, 500),
+    "startup": Tier(30, 10_000),
+    "professional": Tier(150, 100_000),
+}
+# Anonymous clients, per address; no daily allowance.
+ANONYMOUS = Tier(int(os.environ.get("QDA_RATE_IP", 60)), 0)
+
+
+def parse_keys(spec):
+    """'key1:professional,key2:startup' -> {key: Tier}."""
+    keys = {}
+    for part in (spec or "").split(","):
+        key, _, tier = part.strip().partition(":")
+        if key:
+            if tier.strip().lower() not in TIERS:
+                raise ValueError(f"Unknown rate-limit tier for key {key!r}: {tier!r}")
+            keys[key] = TIERS[tier.strip().lower()]
+    return keys
+
+
+class Bucket:
+    """Minute and day token counts for one client as of the last charge."""
+    __slots__ = ("tier", "tokens", "day_tokens", "updated")
+
+    def __init__(self, tier, now):
+        self.tier = tier
+        self.tokens = float(tier.per_minute)
+        self.day_tokens = float(tier.per_day)
+        self.updated = now
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # seconds until the minute bucket is full again
+    retry_after: int  # seconds until the next request can pass (0 if allowed)
+
+
+class RateLimiter:
+    """Sharded token buckets with lazy refill."""
+
+    def __init__(self, keys=None, anonymous=ANONYMOUS, clock=time.monotonic):
+        self.keys = dict(keys or {})
+        self.anonymous = anonymous
+        self.clock = clock
+        self._shards = [({}, threading.Lock()) for _ in range(SHARDS)]
+        self.stats = {"allowed": 0, "limited": 0, "swept": 0}
+
+    def identify(self, api_key, address):
+        """(bucket identity, tier) for a request."""
+        tier = self.keys.get(api_key) if api_key is not None else None
+        if tier is not None:
+            return "key:" + api_key, tier
+        return "ip:" + address, self.anonymous
+
+    @staticmethod
+    def _refilled(bucket, now):
+        """(minute tokens, day tokens) the bucket holds at now."""
+        tier, elapsed = bucket.tier, now - bucket.updated
+        tokens = min(tier.per_minute, bucket.tokens + elapsed * tier.per_minute / 60.0)
+        day_tokens = min(tier.per_day, bucket.day_tokens + elapsed * tier.per_day / 86400.0)
+        return tokens, day_tokens
+
+    def check(self, identity, tier):
+        """Charges one request to identity's bucket and returns the Decision."""
+        now = self.clock()
+        buckets, lock = self._shards[hash(identity) % SHARDS]
+        with lock:
+            bucket = buckets.get(identity)
+            if bucket is None:
+                bucket = buckets[identity] = Bucket(tier, now)
+            # Refill inline (this is the hot path; _refilled is the readable version).
+            elapsed = now - bucket.updated
+            bucket.updated = now
+            tokens = bucket.tokens + elapsed * tier.per_minute / 60.0
+            if tokens > tier.per_minute:
+                tokens = float(tier.per_minute)
+            day_tokens = bucket.day_tokens
+            if tier.per_day:
+                day_tokens = min(tier.per_day, day_tokens + elapsed * tier.per_day / 86400.0)
+            allowed = tokens >= 1.0 and (not tier.per_day or day_tokens >= 1.0)
+            if allowed:
+                tokens -= 1.0
+                if tier.per_day:
+                    day_tokens -= 1.0
+            bucket.tokens = tokens
+            bucket.day_tokens = day_tokens
+
+        reset = math.ceil((tier.per_minute - tokens) * 60.0 / tier.per_minute)
+        if allowed:
+            self.stats["allowed"] += 1
+            return Decision(True, tier.per_minute, int(tokens), reset, 0)
+
+        retry_after = (1.0 - tokens) * 60.0 / tier.per_minute if tokens < 1.0 else 0.0
+        if tier.per_day and day_tokens < 1.0:
+            retry_after = max(retry_after, (1.0 - day_tokens) * 86400.0 / tier.per_day)
+        self.stats["limited"] += 1
+        return Decision(False, tier.per_minute, int(tokens), reset, max(1, math.ceil(retry_after)))
+
+    def sweep_shard(self, index, now=None):
+        """Drops the buckets in one shard that have refilled completely."""
+        now = self.clock() if now is None else now
+        buckets, lock = self._shards[index % SHARDS]
+        with lock:
+            idle = [identity for identity, bucket in buckets.items() if self._is_full(bucket, now)]
+            for identity in idle:
+                del buckets[identity]
+        self.stats["swept"] += len(idle)
+        return len(idle)
+
+    def _is_full(self, bucket, now):
+        tokens, day_tokens = self._refilled(bucket, now)
+        return tokens >= bucket.tier.per_minute and day_tokens >= bucket.tier.per_day
+
+    async def sweep_forever(self, interval=SWEEP_INTERVAL):
+        index = 0
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep_shard(index)
+            index += 1
+
+    def __len__(self):
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+    def snapshot(self):
+        return dict(self.stats, buckets=len(self), keys=len(self.keys))
+
+
+def api_key_from_scope(scope):
+    """The API key from Authorization: Bearer, X-API-Key or ?apikey=, if any."""
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            return value[7:].strip().decode("latin-1") or None
+        if name == b"x-api-key":
+            return value.strip().decode("latin-1") or None
+    query = scope.get("query_string", b"")
+    if b"apikey=" in query:
+        values = parse_qs(query.decode("latin-1")).get("apikey")
+        if values and values[0]:
+            return values[0]
+    return None
+
+
+class RateLimitMiddleware:
+    """Applies a RateLimiter to HTTP requests under the given path prefixes."""
+
+    def __init__(self, app, limiter, prefixes=("/api/",), enabled=ENABLED):
+        self.app = app
+        self.limiter = limiter
+        self.prefixes = tuple(prefixes)
+        self.enabled = enabled
+        self._sweeper = None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            return await self.app(scope, receive, send)
+        if self._sweeper is None:
+            self._sweeper = asyncio.get_running_loop().create_task(self.limiter.sweep_forever())
+
+        client = scope.get("client")
+        identity, tier = self.limiter.identify(api_key_from_scope(scope), client[0] if client else "unknown")
+        decision = self.limiter.check(identity, tier)
+        headers = [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+            (b"x-ratelimit-reset", str(decision.reset).encode()),
+        ]
+
+        if not decision.allowed:
+            body = b'{"status":"error","message":"Rate limit exceeded"}'
+            headers += [
+                (b"retry-after", str(decision.retry_after).encode()),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            await send({"type": "http.response.start", "status": 429, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
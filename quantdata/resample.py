@@ -0,0 +1,221 @@
+"""Multi-resolution OHLC: one base series, every timeframe rolled up from it.
+
+Only the 1-minute series is generated. Each coarser timeframe is aggregated
+from the finest timeframe that divides it (5min from 1min, 15min from 5min,
+... daily from 1h) with open=first, high=max, low=min, close=last and
+volume=sum, so a daily bar always agrees exactly with the 5-minute bars
+inside it.
+
+Rolled-up levels are materialised in chunks of CHUNK_SPAN seconds, aligned
+to the epoch, and kept in one byte-bounded cache shared by all series. Every
+timeframe divides the span, so a chunk at one level is built from exactly
+one chunk of the level below, and a 1h or daily query reads pre-aggregated
+chunks instead of re-aggregating raw minutes.
+
+Only chunks of the requested timeframe are cached. The finer chunks built
+on the way are used once and dropped, and when the cache is full the finest
+level is evicted first, so a long daily range costs a few hundred bytes per
+week instead of flushing every other chunk. Building cold chunks is bounded
+by ROLLUP_WORK one-minute bars per request (see check_work).
+"""
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from quantdata.ohlc import OHLCBars, TIMEFRAMES, normalize_timeframe
+from quantdata.series import SeekableSeries, SeriesBase, series_seed
+
+BASE_TIMEFRAME = "1min"
+# Scales the base walk so 5-minute rollups keep the spread the 5-minute
+# series always had: increments and wicks sqrt(5) smaller, a fifth of the volume.
+BASE_SCALE = 1.0 / np.sqrt(5.0)
+BASE_VOLUME_SCALE = 0.2
+
+# Seconds covered by one cached chunk at every level.
+CHUNK_SPAN = 7 * 86400
+ROLLUP_BYTES = int(os.environ.get("QDA_ROLLUP_BYTES", 32 * 1024 * 1024))
+# One-minute bars a single request may aggregate into uncached chunks;
+# the default covers about 30 years of a daily series built from scratch.
+ROLLUP_WORK = int(os.environ.get("QDA_ROLLUP_WORK", 16_000_000))
+
+
+def parent_timeframe(timeframe):
+    """The coarsest timeframe finer than timeframe that divides it."""
+    step = TIMEFRAMES[timeframe]
+    finer = [tf for tf, s in TIMEFRAMES.items() if s < step and step % s == 0]
+    return max(finer, key=TIMEFRAMES.get)
+
+
+def resample(bars, ratio):
+    """Aggregates every ratio consecutive bars into one (len(bars) must be a multiple)."""
+    shape = (-1, ratio)
+    return OHLCBars(
+        time=bars.time[::ratio],
+        open=bars.open.reshape(shape)[:, 0],
+        high=bars.high.reshape(shape).max(axis=1),
+        low=bars.low.reshape(shape).min(axis=1),
+        close=bars.close.reshape(shape)[:, -1],
+        volume=bars.volume.reshape(shape).sum(axis=1),
+    )
+
+
+class RollupCache:
+    """Rolled-up chunks bounded by total array bytes, one LRU per level.
+
+    Keys start with the level's step in seconds. When over budget the finest
+    level loses its least recently used chunk first, so coarse chunks, which
+    are small and expensive to rebuild, stay while finer ones can be dropped.
+
+    Windows are rendered on worker threads, so access is locked. Two threads
+    missing the same chunk may both build it; the result is identical.
+    """
+
+    def __init__(self, max_bytes=ROLLUP_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._levels = {}  # step -> OrderedDict of key -> bars
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._levels.get(key[0], ())
+
+    def get(self, key):
+        with self._lock:
+            chunks = self._levels.get(key[0])
+            bars = chunks.get(key) if chunks is not None else None
+            if bars is None:
+                self.stats["misses"] += 1
+                return None
+            chunks.move_to_end(key)
+            self.stats["hits"] += 1
+            return bars
+
+    def put(self, key, bars):
+        nbytes = sum(column.nbytes for column in bars)
+        with self._lock:
+            chunks = self._levels.setdefault(key[0], OrderedDict())
+            if key in chunks:
+                return
+            chunks[key] = bars
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                level = self._finest(keep=chunks)
+                if level is None:
+                    break
+                _, oldest = level.popitem(last=False)
+                self.size -= sum(column.nbytes for column in oldest)
+                self.stats["evictions"] += 1
+
+    def _finest(self, keep):
+        """The finest level with a chunk to evict; never the newest chunk, the last one in keep."""
+        for step in sorted(self._levels):
+            level = self._levels[step]
+            if len(level) > (level is keep):
+                return level
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._levels.clear()
+            self.size = 0
+
+    def snapshot(self):
+        names = {step: tf for tf, step in TIMEFRAMES.items()}
+        with self._lock:
+            levels = {names.get(step, step): len(chunks) for step, chunks in sorted(self._levels.items()) if chunks}
+            return dict(self.stats, chunks=sum(levels.values()), levels=levels, bytes=self.size, max_bytes=self.max_bytes)
+
+
+rollups = RollupCache()
+
+
+class ResampledSeries(SeriesBase):
+    """A timeframe rolled up from a finer parent series, served from cached chunks."""
+
+    def __init__(self, parent, timeframe, cache=rollups):
+        self.asset = parent.asset
+        self.symbol = parent.symbol
+        self.timeframe = timeframe
+        self.step = TIMEFRAMES[timeframe]
+        self.seed = series_seed(parent.asset, parent.symbol, timeframe)
+        self.parent = parent
+        self.ratio = self.step // parent.step
+        self.chunk_bars = CHUNK_SPAN // self.step
+        self.parent_chunk_bars = CHUNK_SPAN // parent.step
+        self.cache = cache
+
+    def _chunk(self, chunk, keep=True):
+        """One chunk; built from the parent's chunk if not cached, and cached only if keep."""
+        key = (self.step, self.seed, chunk)
+        bars = self.cache.get(key)
+        if bars is None:
+            if isinstance(self.parent, ResampledSeries):
+                source = self.parent._chunk(chunk, keep=False)
+            else:
+                n = self.parent_chunk_bars
+                source = self.parent.window(chunk * n, n)
+            bars = resample(source, self.ratio)
+            if keep:
+                self.cache.put(key, bars)
+        return bars
+
+    def _work(self, chunk, cached):
+        """One-minute bars that building chunk would generate (0 if it or a parent chunk is cached)."""
+        if cached and (self.step, self.seed, chunk) in self.cache:
+            return 0
+        if isinstance(self.parent, ResampledSeries):
+            return self.parent._work(chunk, cached)
+        return self.parent_chunk_bars
+
+    def rollup_work(self, first, count, cached=True):
+        if count <= 0:
+            return 0
+        c0 = first // self.chunk_bars
+        c1 = (first + count - 1) // self.chunk_bars
+        return sum(self._work(c, cached) for c in range(c0, c1 + 1))
+
+    def window(self, first, count):
+        """Bars first .. first + count - 1 as columns."""
+        count = max(0, int(count))
+        if count == 0:
+            return self.parent.window(first * self.ratio, 0)
+        c0 = first // self.chunk_bars
+        c1 = (first + count - 1) // self.chunk_bars
+        lo = first - c0 * self.chunk_bars
+        parts = [self._chunk(c) for c in range(c0, c1 + 1)]
+        if len(parts) == 1:
+            return OHLCBars(*(column[lo:lo + count] for column in parts[0]))
+        return OHLCBars(*(np.concatenate(columns)[lo:lo + count] for columns in zip(*parts)))
+
+
+def check_work(series, first, count, copies=1, cached=True):
+    """Raises ValueError if serving the window would aggregate more than ROLLUP_WORK uncached minutes.
+
+    copies counts series of the same shape served by one request (a batch);
+    cached=False ignores this process's rollup cache, for work done elsewhere.
+    """
+    work = series.rollup_work(first, count, cached) * copies
+    if work > ROLLUP_WORK:
+        hint = "; rolled-up chunks are cached for the next one" if cached else " or fewer symbols"
+        raise ValueError(
+            f"Range needs {work:,} one-minute bars rolled up; the limit is {ROLLUP_WORK:,} per request. "
+            f"Request a shorter range{hint}."
+        )
+
+
+def base_series(asset, symbol):
+    return SeekableSeries(asset, symbol, BASE_TIMEFRAME, scale=BASE_SCALE, volume_scale=BASE_VOLUME_SCALE)
+
+
+@lru_cache(maxsize=256)
+def open_series(asset, symbol, timeframe):
+    """The series for any supported timeframe, all sharing one base series."""
+    timeframe = normalize_timeframe(timeframe)
+    if timeframe == BASE_TIMEFRAME:
+        return base_series(asset, symbol)
+    return ResampledSeries(open_series(asset, symbol, parent_timeframe(timeframe)), timeframe)
@@ -0,0 +1,187 @@
+"""Deterministic, seekable OHLC series.
+
+Every bar is a pure function of (asset, symbol, timeframe, bar index), so two
+requests for the same window always agree and any window can be produced in
+time proportional to its length rather than its offset.
+
+Randomness is counter-based: a splitmix64 hash of (seed, stream, counter)
+gives each bar its own uniforms without walking a PRNG forward. The price
+path is pinned at block boundaries by a Levy (Brownian bridge) construction
+over a binary tree of blocks, so a block anchor costs O(tree depth); inside
+a block the original per-bar increments are cumsum'd and bridged between the
+two anchors.
+
+A plain walk would wander by the square root of its length, which over
+decades of minutes puts prices in the thousands. Tree nodes more than
+REVERT_BLOCKS blocks apart are therefore independent draws around
+base_price, with the spread a walk reaches over that horizon, and only
+finer nodes are bridged. Within a couple of weeks the path behaves like the
+walk; over longer spans it reverts, so base_price stays the level at any date.
+
+Bar i covers [i * step, (i + 1) * step) in UTC epoch seconds.
+"""
+import hashlib
+from datetime import timezone
+
+import numpy as np
+
+from quantdata.ohlc import CHUNK_BARS, OHLCBars, timeframe_step
+
+# Bars per bridge block and depth of the block tree (2**40 bars in total).
+BLOCK_BITS = 10
+BLOCK = 1 << BLOCK_BITS
+TREE_DEPTH = 30
+
+# Per-step increment is U(-2, 2), variance 4/3.
+STEP_VARIANCE = 4.0 / 3.0
+# Spacing in blocks beyond which anchors no longer follow the walk (power of two).
+REVERT_BLOCKS = 16
+PRICE_FLOOR = 1.0
+
+# Hash streams, one per independent draw.
+_STEP, _HIGH, _LOW, _VOLUME, _ANCHOR, _ROOT, _LEVEL = range(7)
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _uniforms(seed, stream, counters):
+    """Counter-based uniforms in [0, 1): splitmix64(seed, stream, counter)."""
+    with np.errstate(over="ignore"):
+        x = np.atleast_1d(np.asarray(counters, dtype=np.int64)).astype(np.uint64)
+        x = x * _GOLDEN + np.uint64((seed + stream * 0x632BE59BD9B4E019) & 0xFFFFFFFFFFFFFFFF)
+        x ^= x >> np.uint64(30)
+        x *= _MIX1
+        x ^= x >> np.uint64(27)
+        x *= _MIX2
+        x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _normals(seed, stream, counters):
+    """Counter-based standard normals (Box-Muller over two hashed uniforms)."""
+    counters = np.asarray(counters, dtype=np.int64)
+    u1 = 1.0 - _uniforms(seed, stream, counters * 2)
+    u2 = _uniforms(seed, stream, counters * 2 + 1)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+def series_seed(asset, symbol, timeframe):
+    """Stable 64-bit seed for a series key."""
+    key = f"{asset}|{symbol}|{timeframe}".lower().encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def to_epoch(dt):
+    """Seconds since the epoch, reading naive datetimes as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class SeriesBase:
+    """Index arithmetic shared by every series; subclasses set step and provide window()."""
+    step = 1
+
+    def index_range(self, start_ts, end_ts):
+        """(first index, bar count) for bars starting within [start_ts, end_ts]."""
+        first = max(0, -(-to_epoch(start_ts) // self.step))
+        last = to_epoch(end_ts) // self.step
+        return first, max(0, last - first + 1)
+
+    def time_of(self, index):
+        return int(index) * self.step
+
+    def rollup_work(self, first, count, cached=True):
+        """One-minute bars that would be aggregated, uncached, to serve the window."""
+        return 0
+
+    def iter_window(self, first, count, chunk_size=CHUNK_BARS):
+        """Same bars as window(first, count), yielded in chunks."""
+        for offset in range(0, count, chunk_size):
+            yield self.window(first + offset, min(chunk_size, count - offset))
+
+
+class SeekableSeries(SeriesBase):
+    """Random-access view of one (asset, symbol, timeframe) series.
+
+    scale multiplies the per-bar increments and wicks, volume_scale the
+    per-bar volume, so a finer base series can keep the look of coarser bars.
+    """
+
+    def __init__(self, asset, symbol, timeframe, scale=1.0, volume_scale=1.0):
+        self.asset = asset
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.step = timeframe_step(timeframe)
+        self.seed = series_seed(asset, symbol, timeframe)
+        self.scale = scale
+        self.volume_scale = volume_scale
+        self._variance = STEP_VARIANCE * scale * scale
+        self.base_price = 150.0 + float(_uniforms(self.seed, _LEVEL, 0)[0]) * 100.0
+        # Two independent levels REVERT_BLOCKS apart differ by as much as a walk over that span
+        self._level_sd = np.sqrt(self._variance * BLOCK * REVERT_BLOCKS / 2.0)
+        self._ends = _normals(self.seed, _ROOT, np.arange(2)) * self._level_sd
+
+    def _anchors(self, blocks):
+        """Offset from base_price at each block boundary, by descending the bridge tree."""
+        blocks = np.asarray(blocks, dtype=np.int64)
+        lo = np.zeros_like(blocks)
+        hi = np.full_like(blocks, 1 << TREE_DEPTH)
+        v_lo = np.full(blocks.shape, self._ends[0])
+        v_hi = np.full(blocks.shape, self._ends[1])
+        span = 1 << TREE_DEPTH
+        for _ in range(TREE_DEPTH):
+            mid = (lo + hi) >> 1
+            noise = _normals(self.seed, _ANCHOR, mid)
+            if span > REVERT_BLOCKS:
+                v_mid = self._level_sd * noise
+            else:
+                v_mid = (v_lo + v_hi) / 2.0 + np.sqrt(self._variance * BLOCK * span / 4.0) * noise
+            span >>= 1
+            right = blocks >= mid
+            lo = np.where(right, mid, lo)
+            v_lo = np.where(right, v_mid, v_lo)
+            hi = np.where(right, hi, mid)
+            v_hi = np.where(right, v_hi, v_mid)
+        return np.where(blocks == lo, v_lo, v_hi)
+
+    def prices(self, first, count):
+        """Price path at indices first .. first + count - 1 (open of each bar)."""
+        if count <= 0:
+            return np.empty(0)
+        b0 = first >> BLOCK_BITS
+        b1 = (first + count - 1) >> BLOCK_BITS
+        n_blocks = b1 - b0 + 1
+
+        steps = np.arange(b0 * BLOCK, (b1 + 1) * BLOCK, dtype=np.int64)
+        walk = np.cumsum(((_uniforms(self.seed, _STEP, steps) - 0.5) * (4.0 * self.scale)).reshape(n_blocks, BLOCK), axis=1)
+        anchors = self._anchors(np.arange(b0, b1 + 2))
+        drift = walk[:, -1] - np.diff(anchors)
+        frac = np.arange(1, BLOCK + 1) / BLOCK
+        path = anchors[:-1, None] + walk - frac[None, :] * drift[:, None]
+
+        offset = np.concatenate(([anchors[0]], path.ravel()))
+        offset = offset[first - b0 * BLOCK:first - b0 * BLOCK + count]
+        # Reflect off the floor so long horizons never go negative.
+        return PRICE_FLOOR + np.abs(self.base_price + offset - PRICE_FLOOR)
+
+    def window(self, first, count):
+        """Bars first .. first + count - 1 as columns."""
+        count = max(0, int(count))
+        path = self.prices(first, count + 1)
+        index = np.arange(first, first + count, dtype=np.int64)
+        open_, close = path[:-1], path[1:]
+        high = np.maximum(open_, close) + _uniforms(self.seed, _HIGH, index) * (2.0 * self.scale)
+        low = np.maximum(np.minimum(open_, close) - _uniforms(self.seed, _LOW, index) * (2.0 * self.scale), 0.01)
+        volume = (100000 + _uniforms(self.seed, _VOLUME, index) * 900001) * self.volume_scale
+        volume = volume.astype(np.int64)
+        return OHLCBars(
+            time=index * self.step,
+            open=np.round(open_, 2),
+            high=np.round(high, 2),
+            low=np.round(low, 2),
+            close=np.round(close, 2),
+            volume=volume,
+        )
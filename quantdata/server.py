@@ -0,0 +1,137 @@
+"""Launch settings for `python app.py`, chosen by QDA_MODE.
+
+development (default): one process, autoreload, stock asyncio and h11.
+production: no reload; one worker per available CPU (cgroup quota and CPU
+affinity respected; override with QDA_WORKERS or WEB_CONCURRENCY); uvloop
+and httptools when installed; no access log; and a graceful-shutdown window
+of QDA_SHUTDOWN_TIMEOUT seconds for in-flight requests.
+
+uvicorn runs the app's startup hooks before a worker accepts connections, so
+warm_up() there means the first real request finds templates compiled and
+caches filled. Startup time is measured from the moment the OS started the
+process, not from the first import.
+"""
+import importlib.util
+import logging
+import math
+import os
+import time
+
+import uvicorn
+
+MODE = os.environ.get("QDA_MODE", "development").lower()
+SHUTDOWN_TIMEOUT = float(os.environ.get("QDA_SHUTDOWN_TIMEOUT", 20.0))
+# Proxies whose X-Forwarded-For entries are believed. The client address is the
+# rightmost entry not added by one of them; the rate limiter keys on it.
+PRIVATE_PROXIES = "127.0.0.1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+
+logger = logging.getLogger("uvicorn.error")
+_IMPORTED_AT = time.time()
+
+
+def available_cpus():
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count(mode=MODE):
+    configured = os.environ.get("QDA_WORKERS") or os.environ.get("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return available_cpus() if mode == "production" else 1
+
+
+def trusted_proxies():
+    """FORWARDED_ALLOW_IPS, or the private ranges; "*" is refused.
+
+    With "*" uvicorn takes the leftmost X-Forwarded-For entry, which the client
+    controls, so every request could claim a fresh rate-limit bucket.
+    """
+    value = os.environ.get("FORWARDED_ALLOW_IPS", PRIVATE_PROXIES).strip()
+    if value == "*" or "*" in (part.strip() for part in value.split(",")):
+        raise ValueError("FORWARDED_ALLOW_IPS=* lets clients choose their own address; list the proxy addresses instead")
+    return value
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def uvicorn_options(mode=MODE):
+    """Keyword arguments for uvicorn.run in the given mode."""
+    production = mode == "production"
+    return {
+        "host": os.environ.get("HOST", "0.0.0.0"),
+        "port": int(os.environ.get("PORT", 10000)),
+        "reload": not production,
+        "workers": worker_count(mode),
+        "loop": "uvloop" if production and _installed("uvloop") else "asyncio",
+        "http": "httptools" if production and _installed("httptools") else "h11",
+        "access_log": not production,
+        "proxy_headers": True,
+        "forwarded_allow_ips": trusted_proxies(),
+        "timeout_graceful_shutdown": SHUTDOWN_TIMEOUT,
+    }
+
+
+def process_age():
+    """Seconds since the OS started this process (Linux), else since this module was imported."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (start time in clock ticks after boot), counted after the parenthesised command name.
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.time() - _IMPORTED_AT
+
+
+async def warm_up(asgi_app, paths):
+    """GETs each path straight through asgi_app, discarding the body; returns {path: ms}."""
+    timings = {}
+    for path in paths:
+        route, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": route,
+            "raw_path": route.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"localhost")],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 0),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        t0 = time.perf_counter()
+        try:
+            await asgi_app(scope, receive, send)
+        except Exception:
+            logger.exception("Warm-up request for %s failed", path)
+        timings[path] = round((time.perf_counter() - t0) * 1000, 2)
+    return timings
+
+
+def run(app_path="app:app", mode=MODE):
+    uvicorn.run(app_path, **uvicorn_options(mode))
@@ -0,0 +1,35 @@
+"""Request coalescing: concurrent callers with the same key share one computation.
+
+The shared work runs as its own task and every caller awaits it through
+asyncio.shield, so a cancelled caller never cancels the work for the others.
+An exception raised by the work is re-raised in every caller.
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key, fn):
+        """Returns await fn(), sharing the call with any in-flight caller of the same key."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every caller was cancelled.
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def snapshot(self):
+        return dict(self.stats, inflight=len(self._inflight))
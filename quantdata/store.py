@@ -0,0 +1,170 @@
+"""Memory-mapped on-disk bar store.
+
+Each (asset, symbol, timeframe) series can be materialised once into
+<QDA_STORE_DIR>/<asset>/<SYMBOL>/<timeframe>.npy: a .npy file of fixed-width
+48-byte records (RECORD_DTYPE) sorted by time. Files are opened with
+np.load(mmap_mode="r"), so a range query is two binary searches on the time
+column and the returned columns are strided views into the page cache, not
+copies; only the encoder touches the bytes.
+
+StoredSeries sits in front of the generated series with the same interface.
+Windows the file covers are read from disk; anything else falls through to
+the generator, which produces identical bars, so responses do not depend on
+what has been built. Build files with:
+
+    python -m quantdata.store --symbols AAPL,MSFT --timeframes 5min,daily --start 2015-01-01
+"""
+import argparse
+import os
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+from quantdata.ohlc import CHUNK_BARS, COLUMNS, OHLCBars, normalize_timeframe
+from quantdata.resample import open_series
+from quantdata.series import SeriesBase
+
+STORE_DIR = os.environ.get("QDA_STORE_DIR", "data/bars")
+RECORD_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<i8"),
+])
+BUILD_CHUNK_BARS = 64 * CHUNK_BARS
+
+# Asset and symbol become path components; anything else never touches the disk.
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]{0,63}$")
+
+
+class StoredSeries(SeriesBase):
+    """A generated series with a memory-mapped file in front of it."""
+
+    def __init__(self, records, fallback, stats=None):
+        self.records = records
+        self.fallback = fallback
+        self.asset = fallback.asset
+        self.symbol = fallback.symbol
+        self.timeframe = fallback.timeframe
+        self.step = fallback.step
+        self.seed = fallback.seed
+        self.times = records["time"]
+        self.stats = stats if stats is not None else {"hits": 0, "fallbacks": 0}
+
+    def _rows(self, first, count):
+        """Row slice of the file holding bars first .. first + count - 1, or None if not all are stored."""
+        start, stop = self.time_of(first), self.time_of(first + count)
+        lo = int(np.searchsorted(self.times, start, side="left"))
+        hi = int(np.searchsorted(self.times, stop, side="left"))
+        if count and hi - lo == count and self.times[lo] == start:
+            return slice(lo, hi)
+        return None
+
+    def window(self, first, count):
+        """Bars first .. first + count - 1; views into the mapping when the file covers them."""
+        count = max(0, int(count))
+        rows = self._rows(first, count)
+        if rows is not None:
+            self.stats["hits"] += 1
+            rows = self.records[rows]
+            return OHLCBars(*(rows[name] for name in COLUMNS))
+        self.stats["fallbacks"] += 1
+        return self.fallback.window(first, count)
+
+    def rollup_work(self, first, count, cached=True):
+        count = max(0, int(count))
+        return 0 if self._rows(first, count) is not None else self.fallback.rollup_work(first, count, cached)
+
+
+class BarStore:
+    """Opens store files on demand and keeps their mappings until the file changes."""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self._mapped = {}  # path -> ((size, mtime), records)
+        self.stats = {"hits": 0, "fallbacks": 0}
+
+    def path(self, asset, symbol, timeframe):
+        """File for a series, or None if asset/symbol are not safe file names."""
+        if not (_SAFE_NAME.match(asset or "") and _SAFE_NAME.match(symbol or "")):
+            return None
+        return os.path.join(self.directory, asset.lower(), symbol.upper(), normalize_timeframe(timeframe) + ".npy")
+
+    def _records(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._mapped.pop(path, None)
+            return None
+        signature = (st.st_size, st.st_mtime_ns)
+        mapped = self._mapped.get(path)
+        if mapped is None or mapped[0] != signature:
+            records = np.load(path, mmap_mode="r")
+            if records.dtype != RECORD_DTYPE:
+                raise ValueError(f"{path}: unexpected record layout {records.dtype}")
+            mapped = self._mapped[path] = (signature, records)
+        return mapped[1]
+
+    def series(self, asset, symbol, timeframe):
+        """The stored series if a file exists, otherwise the generated one."""
+        generated = open_series(asset, symbol, timeframe)
+        path = self.path(asset, symbol, timeframe)
+        records = self._records(path) if path else None
+        if records is None or not len(records):
+            return generated
+        return StoredSeries(records, generated, self.stats)
+
+    def snapshot(self):
+        return dict(self.stats, files=len(self._mapped))
+
+
+def build(store, asset, symbol, timeframe, start_ts, end_ts):
+    """Writes the generated bars for [start_ts, end_ts] to the store; returns (path, bars)."""
+    series = open_series(asset, symbol, timeframe)
+    path = store.path(asset, symbol, timeframe)
+    if path is None:
+        raise ValueError(f"Unsafe asset or symbol name: {asset!r}, {symbol!r}")
+    first, count = series.index_range(start_ts, end_ts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Written next to the target and renamed, so readers never see a partial file.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=RECORD_DTYPE, shape=(count,))
+    written = 0
+    for bars in series.iter_window(first, count, BUILD_CHUNK_BARS):
+        rows = out[written:written + len(bars)]
+        for name in COLUMNS:
+            rows[name] = getattr(bars, name)
+        written += len(bars)
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return path, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fills the bar store from the generator.")
+    parser.add_argument("--dir", default=STORE_DIR)
+    parser.add_argument("--asset", default="equities")
+    parser.add_argument("--symbols", default="AAPL")
+    parser.add_argument("--timeframes", default="5min")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default=datetime.utcnow().strftime("%Y-%m-%d"))
+    args = parser.parse_args()
+
+    store = BarStore(args.dir)
+    start_ts = datetime.strptime(args.start, "%Y-%m-%d")
+    end_ts = datetime.strptime(args.end, "%Y-%m-%d")
+    for symbol in args.symbols.split(","):
+        for timeframe in args.timeframes.split(","):
+            t0 = time.perf_counter()
+            path, count = build(store, args.asset, symbol.strip().upper(), timeframe.strip(), start_ts, end_ts)
+            print(f"{path}: {count:,} bars, {os.path.getsize(path) / 2**20:.1f} MiB in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
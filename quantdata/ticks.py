@@ -0,0 +1,141 @@
+"""Live tick fan-out for the /ws/ticks WebSocket feed.
+
+One producer task per symbol generates ticks while anyone is subscribed.
+Each tick is encoded once and offered to every subscriber's bounded queue;
+a full queue drops its oldest message (conflation) and a subscriber that
+keeps falling behind is evicted, so a slow consumer never stalls the producer.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+from quantdata.resample import open_series
+
+TICK_INTERVAL = float(os.environ.get("QDA_TICK_INTERVAL", 0.1))
+QUEUE_SIZE = int(os.environ.get("QDA_WS_QUEUE", 256))
+# Conflated messages in a row before a subscriber is evicted.
+MAX_DROPS = int(os.environ.get("QDA_WS_MAX_DROPS", 1024))
+MAX_SYMBOLS = 50
+# Same shape the bar store accepts as a file name.
+_SYMBOL = re.compile(r"^[A-Z0-9_-][A-Z0-9._-]{0,63}$")
+
+
+def parse_subscription(value):
+    """Upper-cased names from a command's "symbols" list; raises ValueError on anything else."""
+    if not isinstance(value, list):
+        raise ValueError("symbols must be a list of names")
+    if len(value) > MAX_SYMBOLS:
+        raise ValueError(f"At most {MAX_SYMBOLS} symbols per connection")
+    symbols = [s.upper() if isinstance(s, str) else s for s in value]
+    for symbol in symbols:
+        if not isinstance(symbol, str) or not _SYMBOL.match(symbol):
+            raise ValueError(f"Invalid symbol: {str(symbol)[:64]!r}")
+    return symbols
+
+
+class Subscriber:
+    """One connection's bounded outbox and subscription set."""
+    __slots__ = ("queue", "symbols", "dropped", "evicted")
+
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self.queue = asyncio.Queue(maxsize)
+        self.symbols = set()
+        self.dropped = 0
+        self.evicted = False
+
+    def offer(self, message):
+        """Enqueues without waiting; returns False once the subscriber should be evicted."""
+        try:
+            self.queue.put_nowait(message)
+            self.dropped = 0
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped > MAX_DROPS:
+                return False
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+            return True
+
+    def evict(self):
+        """Empties the outbox and wakes the writer with the None sentinel."""
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class TickHub:
+    """Symbol -> subscribers registry with one producer task per active symbol."""
+
+    def __init__(self, interval=TICK_INTERVAL):
+        self.interval = interval
+        self._subscribers = {}
+        self._producers = {}
+        self.stats = {"ticks": 0, "delivered": 0, "conflated": 0, "evicted": 0}
+
+    def subscribe(self, subscriber, symbol):
+        if symbol in subscriber.symbols:
+            return
+        subscriber.symbols.add(symbol)
+        self._subscribers.setdefault(symbol, set()).add(subscriber)
+        if symbol not in self._producers:
+            self._producers[symbol] = asyncio.get_running_loop().create_task(self._produce(symbol))
+
+    def unsubscribe(self, subscriber, symbol):
+        subscriber.symbols.discard(symbol)
+        subscribers = self._subscribers.get(symbol)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[symbol]
+            self._producers.pop(symbol).cancel()
+
+    def unsubscribe_all(self, subscriber):
+        for symbol in list(subscriber.symbols):
+            self.unsubscribe(subscriber, symbol)
+
+    def close(self):
+        """Stops every producer; subscribers are left to their sockets closing."""
+        for task in self._producers.values():
+            task.cancel()
+        self._producers.clear()
+        self._subscribers.clear()
+
+    def broadcast(self, symbol, message):
+        """Offers one encoded message to every subscriber of symbol."""
+        for subscriber in list(self._subscribers.get(symbol, ())):
+            before = subscriber.dropped
+            if subscriber.offer(message):
+                self.stats["delivered"] += 1
+                self.stats["conflated"] += subscriber.dropped > before
+            else:
+                self.stats["evicted"] += 1
+                self.unsubscribe_all(subscriber)
+                subscriber.evict()
+
+    async def _produce(self, symbol):
+        series = open_series("equities", symbol, "1min")
+        price = float(series.prices(int(time.time()) // series.step, 1)[0])
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        seq = 0
+        while True:
+            price = max(0.01, price + random.gauss(0.0, 0.02))
+            seq += 1
+            message = json.dumps({
+                "type": "tick",
+                "symbol": symbol,
+                "seq": seq,
+                "price": round(price, 2),
+                "size": random.randint(1, 50) * 100,
+                "ts": time.time(),
+            })
+            self.stats["ticks"] += 1
+            self.broadcast(symbol, message)
+            next_at += self.interval
+            await asyncio.sleep(max(0.0, next_at - loop.time()))